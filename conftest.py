@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True, scope='session')
+def local_test_settings():
+    from core.testing import test_settings
+
+    with test_settings():
+        yield
@@ -0,0 +1,121 @@
+"""
+Сериализация лент в JSON без создания экземпляров моделей.
+
+Выборки делаются через values() с нужными полями связанных моделей,
+а строки превращаются в словари ответа простыми функциями.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from django.core.files.storage import default_storage
+
+from core.paginator import KeysetPage
+
+POST_FIELDS = (
+    'id',
+    'text',
+    'pub_date',
+    'image',
+    'comments_count',
+    'author__username',
+    'author__first_name',
+    'author__last_name',
+    'group__slug',
+    'group__title',
+)
+COMMENT_FIELDS = (
+    'id',
+    'text',
+    'created',
+    'author__username',
+    'author__first_name',
+    'author__last_name',
+)
+GROUP_FIELDS = ('id', 'slug', 'title', 'description')
+AUTHOR_FIELDS = (
+    'id',
+    'username',
+    'first_name',
+    'last_name',
+    'stats__posts_count',
+    'stats__followers_count',
+    'stats__following_count',
+)
+
+
+def encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} не сериализуется в JSON')
+
+
+def dumps(data: Any) -> str:
+    return json.dumps(
+        data,
+        ensure_ascii=False,
+        separators=(',', ':'),
+        default=encode_value,
+    )
+
+
+def full_name(row: Dict[str, Any], prefix: str = '') -> str:
+    return f'{row[prefix + "first_name"]} {row[prefix + "last_name"]}'.strip()
+
+
+def post_data(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'pub_date': row['pub_date'],
+        'author': {
+            'username': row['author__username'],
+            'full_name': full_name(row, 'author__'),
+        },
+        'group': (
+            {'slug': row['group__slug'], 'title': row['group__title']}
+            if row['group__slug']
+            else None
+        ),
+        'image': default_storage.url(row['image']) if row['image'] else None,
+        'comments_count': row['comments_count'],
+    }
+
+
+def comment_data(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'created': row['created'],
+        'author': {
+            'username': row['author__username'],
+            'full_name': full_name(row, 'author__'),
+        },
+    }
+
+
+def group_data(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'slug': row['slug'],
+        'title': row['title'],
+        'description': row['description'],
+    }
+
+
+def author_data(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'username': row['username'],
+        'full_name': full_name(row),
+        'posts_count': row['stats__posts_count'] or 0,
+        'followers_count': row['stats__followers_count'] or 0,
+        'following_count': row['stats__following_count'] or 0,
+    }
+
+
+def page_data(page: KeysetPage, serialize) -> Dict[str, Optional[Any]]:
+    return {
+        'results': [serialize(row) for row in page],
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    }
@@ -0,0 +1,124 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from posts.models import Follow
+
+User = get_user_model()
+
+
+class ApiViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = mixer.blend(
+            User,
+            username='TestUser',
+            first_name='Лев',
+            last_name='Толстой',
+        )
+        cls.reader = mixer.blend(User, username='Reader')
+        cls.group = mixer.blend('posts.Group', slug='test-slug')
+        cls.post = mixer.blend(
+            'posts.Post',
+            author=cls.user,
+            group=cls.group,
+            text='Тестовый пост',
+        )
+        mixer.cycle(3).blend('posts.Comment', post=cls.post, author=cls.user)
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+        cls.anon = Client()
+        cls.reader_client = Client()
+
+        cls.reader_client.force_login(cls.reader)
+
+    def test_post_fields(self):
+        """Пост сериализуется вместе с автором и группой."""
+        response = self.anon.get(reverse('api:index'))
+        self.assertEqual(
+            response['Content-Type'],
+            'application/json; charset=utf-8',
+        )
+        post = response.json()['results'][0]
+        self.assertEqual(post['id'], self.post.pk)
+        self.assertEqual(post['text'], 'Тестовый пост')
+        self.assertEqual(
+            post['author'],
+            {'username': 'TestUser', 'full_name': 'Лев Толстой'},
+        )
+        self.assertEqual(post['group']['slug'], 'test-slug')
+        self.assertEqual(post['comments_count'], 3)
+        self.assertEqual(post['pub_date'], self.post.pub_date.isoformat())
+
+    def test_feeds(self):
+        """Ленты группы, профиля и подписок содержат пост."""
+        urls = {
+            reverse('api:group_list', args=(self.group.slug,)): 'group',
+            reverse('api:profile', args=(self.user.username,)): 'author',
+        }
+        for url, key in urls.items():
+            with self.subTest(url=url):
+                data = self.anon.get(url).json()
+                self.assertIn(key, data)
+                self.assertEqual(data['results'][0]['id'], self.post.pk)
+        data = self.reader_client.get(reverse('api:follow_index')).json()
+        self.assertEqual(data['results'][0]['id'], self.post.pk)
+
+    def test_post_detail_with_comments(self):
+        """Пост отдаётся со страницей комментариев."""
+        data = self.anon.get(
+            reverse('api:post_detail', args=(self.post.pk,)),
+        ).json()
+        self.assertEqual(data['post']['id'], self.post.pk)
+        self.assertEqual(len(data['comments']['results']), 3)
+
+    def test_cursor_pagination(self):
+        """Курсоры обходят ленту без повторов и пропусков."""
+        mixer.cycle(settings.POSTS_QUANTITY + 2).blend(
+            'posts.Post',
+            author=self.user,
+        )
+        url = reverse('api:profile', args=(self.user.username,))
+        seen = []
+        cursor = ''
+        while cursor is not None:
+            data = self.anon.get(url, {'cursor': cursor}).json()
+            seen += [post['id'] for post in data['results']]
+            cursor = data['next']
+        self.assertEqual(
+            seen,
+            list(
+                self.user.posts.order_by('-pub_date', '-pk').values_list(
+                    'pk', flat=True
+                ),
+            ),
+        )
+
+    def test_index_single_query(self):
+        """Лента строится одним запросом без COUNT(*)."""
+        with self.assertNumQueries(1):
+            self.anon.get(reverse('api:index'))
+
+    def test_errors(self):
+        """Ошибки отдаются в JSON."""
+        cases = (
+            (self.anon, reverse('api:follow_index'), 401),
+            (self.anon, reverse('api:profile', args=('nobody',)), 404),
+            (self.anon, reverse('api:group_list', args=('nothing',)), 404),
+            (
+                self.anon,
+                reverse('api:post_detail', args=(self.post.pk + 100,)),
+                404,
+            ),
+        )
+        for client, url, status in cases:
+            with self.subTest(url=url):
+                response = client.get(url)
+                self.assertEqual(response.status_code, status)
+                self.assertIn('detail', response.json())
+        response = self.anon.post(reverse('api:index'))
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,14 @@
+from django.urls import path
+
+from api import views
+from api.apps import ApiConfig
+
+app_name = ApiConfig.name
+
+urlpatterns = [
+    path('posts/', views.index, name='index'),
+    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('profile/<str:username>/', views.profile, name='profile'),
+    path('follow/', views.follow_index, name='follow_index'),
+]
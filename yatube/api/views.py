@@ -0,0 +1,117 @@
+from http import HTTPStatus
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models.query import QuerySet
+from django.http import HttpRequest, HttpResponse
+from django.views.decorators.http import require_GET
+
+from api import serializers
+from core.paginator import KeysetPage, KeysetPaginator
+from posts import timeline
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+def json_response(data: Any, status: int = HTTPStatus.OK) -> HttpResponse:
+    return HttpResponse(
+        serializers.dumps(data),
+        content_type='application/json; charset=utf-8',
+        status=status,
+    )
+
+
+def error(status: HTTPStatus) -> HttpResponse:
+    return json_response({'detail': status.phrase}, status=status)
+
+
+def keyset_page(
+    request: HttpRequest,
+    queryset: QuerySet,
+    per_page: int = settings.POSTS_QUANTITY,
+    key_field: str = 'pub_date',
+) -> KeysetPage:
+    return KeysetPaginator(queryset, per_page, key_field=key_field).get_page(
+        request.GET.get('cursor'),
+    )
+
+
+def posts_page(request: HttpRequest, posts: QuerySet) -> dict:
+    page = keyset_page(request, posts.values(*serializers.POST_FIELDS))
+    return serializers.page_data(page, serializers.post_data)
+
+
+@require_GET
+def index(request: HttpRequest) -> HttpResponse:
+    return json_response(posts_page(request, Post.objects.all()))
+
+
+@require_GET
+def group_posts(request: HttpRequest, slug: str) -> HttpResponse:
+    group = (
+        Group.objects.filter(slug=slug)
+        .values(*serializers.GROUP_FIELDS)
+        .first()
+    )
+    if group is None:
+        return error(HTTPStatus.NOT_FOUND)
+    return json_response(
+        {
+            'group': serializers.group_data(group),
+            **posts_page(request, Post.objects.filter(group_id=group['id'])),
+        },
+    )
+
+
+@require_GET
+def profile(request: HttpRequest, username: str) -> HttpResponse:
+    author = (
+        User.objects.filter(username=username)
+        .values(*serializers.AUTHOR_FIELDS)
+        .first()
+    )
+    if author is None:
+        return error(HTTPStatus.NOT_FOUND)
+    return json_response(
+        {
+            'author': serializers.author_data(author),
+            **posts_page(request, Post.objects.filter(author_id=author['id'])),
+        },
+    )
+
+
+@require_GET
+def follow_index(request: HttpRequest) -> HttpResponse:
+    if not request.user.is_authenticated:
+        return error(HTTPStatus.UNAUTHORIZED)
+    return json_response(posts_page(request, timeline.feed(request.user)))
+
+
+@require_GET
+def post_detail(request: HttpRequest, post_id: int) -> HttpResponse:
+    post = (
+        Post.objects.filter(pk=post_id)
+        .values(*serializers.POST_FIELDS)
+        .first()
+    )
+    if post is None:
+        return error(HTTPStatus.NOT_FOUND)
+    comments = keyset_page(
+        request,
+        Comment.objects.filter(post_id=post_id).values(
+            *serializers.COMMENT_FIELDS,
+        ),
+        settings.COMMENTS_QUANTITY,
+        key_field='created',
+    )
+    return json_response(
+        {
+            'post': serializers.post_data(post),
+            'comments': serializers.page_data(
+                comments,
+                serializers.comment_data,
+            ),
+        },
+    )
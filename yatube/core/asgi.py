@@ -0,0 +1,48 @@
+"""
+ASGI-обёртка над WSGI-приложением Django.
+
+asgiref.wsgi.WsgiToAsgi выполняет все запросы в одном общем потоке,
+поэтому медленный запрос к БД блокирует процесс целиком. Здесь каждый
+запрос уходит в пул потоков цикла событий (размер задаёт ASGI_THREADS).
+"""
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+
+class ThreadPoolInstance(WsgiToAsgiInstance):
+    @sync_to_async(thread_sensitive=False)
+    def run_wsgi_app(self, body: bytes) -> None:
+        """
+        Выполняет WSGI-приложение и отправляет ответ по частям.
+
+        start_response вызывается в том же потоке, что и приложение.
+        Тело ответа обрезается по Content-Length, если он указан.
+        """
+        environ = self.build_environ(self.scope, body)
+        bytes_sent = 0
+        for output in self.wsgi_application(environ, self.start_response):
+            if not self.response_started:
+                self.response_started = True
+                self.sync_send(self.response_start)
+            if self.response_content_length is not None:
+                output = output[: self.response_content_length - bytes_sent]
+            self.sync_send(
+                {
+                    'type': 'http.response.body',
+                    'body': output,
+                    'more_body': True,
+                },
+            )
+            bytes_sent += len(output)
+            if bytes_sent == self.response_content_length:
+                break
+        if not self.response_started:
+            self.response_started = True
+            self.sync_send(self.response_start)
+        self.sync_send({'type': 'http.response.body'})
+
+
+class ThreadPoolWsgiToAsgi(WsgiToAsgi):
+    async def __call__(self, scope, receive, send):
+        await ThreadPoolInstance(self.wsgi_application)(scope, receive, send)
@@ -0,0 +1,8 @@
+from django.db.backends.postgresql import base
+
+from core.backends.postgresql.creation import DatabaseCreation
+from core.pool import PooledConnectionMixin
+
+
+class DatabaseWrapper(PooledConnectionMixin, base.DatabaseWrapper):
+    creation_class = DatabaseCreation
@@ -0,0 +1,208 @@
+"""
+Нагрузочные замеры основных страниц через тестовый клиент Django.
+
+Для каждого сценария выполняется прогрев и заданное число запросов,
+после чего считаются пропускная способность и перцентили задержки.
+"""
+
+import math
+import subprocess
+import time
+from http import HTTPStatus
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+Scenario = Tuple[str, Client, str, str, Optional[Dict[str, str]]]
+
+# Замеры чистят кэш перед каждым сценарием, поэтому идут на своих
+# кэшах в памяти, а не на кэшах сайта.
+BENCHMARK_CACHES = {
+    alias: {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': f'benchmark-{alias}',
+        'TIMEOUT': timeout,
+    }
+    for alias, timeout in (('default', 60 * 60), ('state', None))
+}
+
+# Отправка комментария отвечает перенаправлением на страницу поста.
+EXPECTED_STATUS = {'get': HTTPStatus.OK, 'post': HTTPStatus.FOUND}
+
+
+def percentile(values: List[float], rank: float) -> float:
+    ordered = sorted(values)
+    index = max(math.ceil(rank / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', 'HEAD'),
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def scenarios() -> List[Scenario]:
+    reader = (
+        User.objects.filter(pk__in=Follow.objects.values('user'))
+        .order_by('pk')
+        .first()
+        or User.objects.order_by('pk').first()
+    )
+    author = User.objects.filter(posts__isnull=False).order_by('pk').first()
+    group = Group.objects.filter(posts__isnull=False).order_by('pk').first()
+    post = Post.objects.order_by('-comments_count', 'pk').first()
+    anon = Client()
+    client = Client()
+    client.force_login(reader)
+    return [
+        ('index', anon, 'get', reverse('posts:index'), None),
+        (
+            'group_posts',
+            anon,
+            'get',
+            reverse('posts:group_list', args=(group.slug,)),
+            None,
+        ),
+        (
+            'profile',
+            anon,
+            'get',
+            reverse('posts:profile', args=(author.username,)),
+            None,
+        ),
+        (
+            'post_detail',
+            anon,
+            'get',
+            reverse('posts:post_detail', args=(post.id,)),
+            None,
+        ),
+        ('follow_index', client, 'get', reverse('posts:follow_index'), None),
+        (
+            'add_comment',
+            client,
+            'post',
+            reverse('posts:add_comment', args=(post.id,)),
+            {'text': 'Комментарий из замера'},
+        ),
+        ('api_index', anon, 'get', reverse('api:index'), None),
+        (
+            'api_group_posts',
+            anon,
+            'get',
+            reverse('api:group_list', args=(group.slug,)),
+            None,
+        ),
+        (
+            'api_profile',
+            anon,
+            'get',
+            reverse('api:profile', args=(author.username,)),
+            None,
+        ),
+        (
+            'api_post_detail',
+            anon,
+            'get',
+            reverse('api:post_detail', args=(post.id,)),
+            None,
+        ),
+        ('api_follow_index', client, 'get', reverse('api:follow_index'), None),
+    ]
+
+
+def timed(
+    call: Callable[[], object],
+    requests: int,
+    warmup: int,
+) -> Dict[str, float]:
+    for _ in range(warmup):
+        call()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        begin = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - begin)
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': requests,
+        'throughput_rps': round(requests / elapsed, 2),
+        'mean_ms': round(sum(latencies) / requests * 1000, 3),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def measure(
+    client: Client,
+    method: str,
+    url: str,
+    data: Optional[Dict[str, str]],
+    requests: int,
+    warmup: int,
+) -> Dict[str, float]:
+    send = getattr(client, method)
+    expected = EXPECTED_STATUS[method]
+
+    def call() -> None:
+        response = send(url, data)
+        if response.status_code != expected:
+            raise RuntimeError(
+                f'{method.upper()} {url}: код ответа '
+                f'{response.status_code}, ожидался {expected.value}',
+            )
+
+    return timed(call, requests, warmup)
+
+
+def reconnect() -> None:
+    """Закрывает соединение и выполняет запрос, как в начале запроса."""
+    connection.close()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+def run(
+    dataset: Dict[str, int],
+    requests: int = 200,
+    warmup: int = 20,
+    only: Optional[List[str]] = None,
+) -> Dict:
+    results = {}
+    with override_settings(CACHES=BENCHMARK_CACHES):
+        for name, client, method, url, data in scenarios():
+            if only and name not in only:
+                continue
+            cache.clear()
+            results[name] = measure(
+                client,
+                method,
+                url,
+                data,
+                requests,
+                warmup,
+            )
+    if not only or 'db_connect' in only:
+        results['db_connect'] = timed(reconnect, requests, warmup)
+    return {
+        'commit': current_commit(),
+        'timestamp': time.time(),
+        'dataset': dataset,
+        'results': results,
+    }
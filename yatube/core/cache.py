@@ -0,0 +1,144 @@
+"""
+Поколенческая инвалидация кэша.
+
+Каждая область (например, posts) хранит номер поколения, который входит
+в ключи закэшированных страниц. Номера лежат в отдельном кэше state, где
+записи не вытесняются: иначе сброс номера молча ломал бы инвалидацию.
+Запись в модель увеличивает номер, и старые ключи просто перестают
+читаться, поэтому страницы можно кэшировать надолго без риска отдать
+устаревшие данные.
+
+Те же номера поколений, заведённые на отдельные объекты, служат версиями
+для ETag: условный GET проверяется без рендера страницы.
+"""
+
+import hashlib
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.cache import cache_page
+
+GENERATION_KEY = 'generation:{}'
+STATE_CACHE = 'state'
+
+
+def state_cache() -> BaseCache:
+    """Хранилище без вытеснения для номеров поколений и очередей."""
+    return caches[STATE_CACHE]
+
+
+def initial_generation() -> int:
+    return int(time.time() * 1000)
+
+
+def get_generations(scopes: Iterable[str]) -> Dict[str, int]:
+    keys = {GENERATION_KEY.format(scope): scope for scope in scopes}
+    cache = state_cache()
+    stored = cache.get_many(keys)
+    missing = {key: initial_generation() for key in keys if key not in stored}
+    if missing:
+        cache.set_many(missing, None)
+        stored.update(missing)
+    return {scope: stored[key] for key, scope in keys.items()}
+
+
+def get_generation(scope: str) -> int:
+    return get_generations((scope,))[scope]
+
+
+def _increment(scopes: Iterable[str]) -> None:
+    cache = state_cache()
+    for scope in scopes:
+        key = GENERATION_KEY.format(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, initial_generation(), None)
+
+
+def bump_generation(*scopes: str) -> None:
+    """
+    Увеличивает номера сразу и, если идёт транзакция, ещё раз после
+    коммита: читатель, успевший до коммита закэшировать старые данные
+    под новым номером, иначе отдавал бы их до конца срока кэша.
+    """
+    _increment(scopes)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _increment(scopes))
+
+
+def generation_prefix(key_prefix: str, scopes: Iterable[str]) -> str:
+    generations = get_generations(scopes)
+    return '.'.join(
+        [key_prefix] + [f'{scope}{generations[scope]}' for scope in scopes],
+    )
+
+
+def cache_page_generation(
+    timeout: int,
+    key_prefix: str,
+    scopes: Iterable[str],
+) -> Callable:
+    scopes = tuple(scopes)
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            cached_view = cache_page(
+                timeout,
+                key_prefix=generation_prefix(key_prefix, scopes),
+            )(view)
+            return cached_view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def versions_etag(scopes: Iterable[str], *extra: Any) -> str:
+    scopes = tuple(scopes)
+    generations = get_generations(scopes)
+    raw = ':'.join(
+        [str(generations[scope]) for scope in scopes]
+        + [str(value) for value in extra],
+    )
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def conditional(
+    validators: Callable[..., Optional[str]],
+) -> Callable:
+    """
+    Отвечает 304 Not Modified, не вызывая представление.
+
+    validators(request, *args, **kwargs) возвращает ETag или None, если
+    страницу нужно просто отрисовать, например, когда объекта нет и
+    представление ответит 404. Last-Modified не отдаётся.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            etag = validators(request, *args, **kwargs)
+            if etag is None:
+                return view(request, *args, **kwargs)
+            etag = quote_etag(etag)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                if not response.has_header('ETag'):
+                    response['ETag'] = etag
+                patch_cache_control(response, no_cache=True)
+            return response
+
+        return wrapper
+
+    return decorator
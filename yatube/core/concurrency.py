@@ -0,0 +1,71 @@
+"""
+Параллельное выполнение независимых обращений к БД внутри одного запроса.
+
+Django 2.2 вызывает представления синхронно, поэтому вместо корутин
+независимые части страницы (автор, страница постов, признак подписки)
+выполняются в пуле потоков, у каждого из которых своё соединение с БД.
+Размер пула задаётся settings.VIEW_QUERY_WORKERS; при 0 всё выполняется
+последовательно в потоке запроса.
+"""
+
+import contextvars
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Any, Callable, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from core.metrics import track_query
+
+_executor: Optional[Executor] = None
+
+
+def get_executor() -> Optional[Executor]:
+    global _executor
+    if not settings.VIEW_QUERY_WORKERS:
+        return None
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.VIEW_QUERY_WORKERS,
+            thread_name_prefix='view-queries',
+        )
+    return _executor
+
+
+def _call_in_worker(call: Callable[[], Any]) -> Any:
+    close_old_connections()
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(track_query))
+            return call()
+    finally:
+        close_old_connections()
+
+
+def gather(*calls: Callable[[], Any]) -> Tuple[Any, ...]:
+    """
+    Выполняет вызовы одновременно и возвращает результаты по порядку.
+
+    Первый вызов выполняется в текущем потоке, остальные — в пуле.
+    Исключение первого по порядку упавшего вызова пробрасывается дальше.
+    """
+    executor = get_executor()
+    if executor is None or len(calls) < 2:
+        return tuple(call() for call in calls)
+    futures = [
+        executor.submit(
+            contextvars.copy_context().run,
+            _call_in_worker,
+            call,
+        )
+        for call in calls[1:]
+    ]
+    try:
+        first = calls[0]()
+    except Exception:
+        for future in futures:
+            future.cancel()
+        raise
+    return (first,) + tuple(future.result() for future in futures)
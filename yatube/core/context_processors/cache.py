@@ -0,0 +1,10 @@
+from typing import Dict
+
+from django.conf import settings
+from django.http import HttpRequest
+
+
+def timeouts(request: HttpRequest) -> Dict[str, int]:
+    return {
+        'post_card_cache_timeout': settings.POST_CARD_CACHE_TIMEOUT,
+    }
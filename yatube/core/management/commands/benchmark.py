@@ -0,0 +1,83 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.benchmark import run
+from posts.seeding import seed
+
+SCENARIOS = (
+    'index',
+    'group_posts',
+    'profile',
+    'post_detail',
+    'follow_index',
+    'add_comment',
+    'api_index',
+    'api_group_posts',
+    'api_profile',
+    'api_post_detail',
+    'api_follow_index',
+    'db_connect',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет отдельную тестовую БД данными и замеряет '
+        'пропускную способность и задержки основных страниц'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument('--comments', type=int, default=10000)
+        parser.add_argument('--follows', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument(
+            '--only',
+            nargs='+',
+            choices=SCENARIOS,
+            help='Сценарии для замера (по умолчанию все)',
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл для результатов в формате JSON',
+        )
+
+    def handle(self, *args, **options):
+        old_name = connection.creation.create_test_db(
+            verbosity=0,
+            autoclobber=True,
+            serialize=False,
+        )
+        try:
+            dataset = seed(
+                users=options['users'],
+                groups=options['groups'],
+                posts=options['posts'],
+                comments=options['comments'],
+                follows=options['follows'],
+                seed=options['seed'],
+            )
+            report = run(
+                dataset,
+                requests=options['requests'],
+                warmup=options['warmup'],
+                only=options['only'],
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        for name, result in report['results'].items():
+            self.stdout.write(
+                f'{name:<17} {result["throughput_rps"]:>9.1f} rps  '
+                f'p50 {result["p50_ms"]:>8.2f} ms  '
+                f'p99 {result["p99_ms"]:>8.2f} ms',
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, ensure_ascii=False, indent=2)
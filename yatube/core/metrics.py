@@ -0,0 +1,157 @@
+"""
+Внутрипроцессные гистограммы длительности запросов.
+
+Для каждого имени URL (posts:index, posts:profile и т.д.) копятся число
+SQL-запросов, время в БД, время рендера шаблонов и общая длительность.
+Данные отдаются в текстовом формате Prometheus.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DURATION_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+METRICS = (
+    ('yatube_request_duration_seconds', 'Общая длительность', 'total'),
+    ('yatube_db_duration_seconds', 'Время в БД', 'db_time'),
+    ('yatube_template_duration_seconds', 'Время рендера шаблонов', 'render'),
+    ('yatube_db_queries', 'Число SQL-запросов', 'queries'),
+)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Iterator[Tuple[str, int]]:
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield str(bound), total
+
+
+class RequestTimings:
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.render = 0.0
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        return ', '.join(
+            (
+                f'db;desc="{self.queries} queries";'
+                f'dur={self.db_time * 1000:.1f}',
+                f'tpl;dur={self.render * 1000:.1f}',
+                f'total;dur={self.total * 1000:.1f}',
+            ),
+        )
+
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    'current_timings',
+    default=None,
+)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+
+    def histogram(self, metric: str, view: str) -> Histogram:
+        key = (metric, view)
+        if key not in self.histograms:
+            buckets = (
+                QUERY_BUCKETS
+                if metric == 'yatube_db_queries'
+                else DURATION_BUCKETS
+            )
+            self.histograms[key] = Histogram(buckets)
+        return self.histograms[key]
+
+    def record(self, view: str, timings: RequestTimings) -> None:
+        total = timings.total
+        with self.lock:
+            for metric, _, attr in METRICS:
+                value = total if attr == 'total' else getattr(timings, attr)
+                self.histogram(metric, view).observe(value)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.histograms.clear()
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self.lock:
+            for metric, description, _ in METRICS:
+                lines.append(f'# HELP {metric} {description}')
+                lines.append(f'# TYPE {metric} histogram')
+                for (name, view), histogram in sorted(self.histograms.items()):
+                    if name != metric:
+                        continue
+                    for bound, count in histogram.cumulative():
+                        lines.append(
+                            f'{metric}_bucket{{view="{view}",le="{bound}"}} '
+                            f'{count}',
+                        )
+                    lines.append(
+                        f'{metric}_sum{{view="{view}"}} {histogram.sum}',
+                    )
+                    lines.append(
+                        f'{metric}_count{{view="{view}"}} {histogram.count}',
+                    )
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def track_query(execute, sql, params, many, context):
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.db_time += time.perf_counter() - started
+
+
+def track_render(render, *args, **kwargs):
+    timings = current_timings.get()
+    if timings is None:
+        return render(*args, **kwargs)
+    started = time.perf_counter()
+    try:
+        return render(*args, **kwargs)
+    finally:
+        timings.render += time.perf_counter() - started
@@ -0,0 +1,65 @@
+from contextlib import ExitStack
+from typing import Callable
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+
+from core.metrics import (
+    RequestTimings,
+    current_timings,
+    registry,
+    track_query,
+)
+from core.routers import (
+    STICKY_COOKIE,
+    reads_from_replica,
+    replica_reads,
+    writes,
+)
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(track_query),
+                    )
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        match = request.resolver_match
+        registry.record(match.view_name if match else 'unresolved', timings)
+        response['Server-Timing'] = timings.server_timing()
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        token = replica_reads.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_reads.reset(token)
+        if writes(request):
+            response.set_cookie(
+                STICKY_COOKIE,
+                '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request: HttpRequest, *args) -> None:
+        replica_reads.set(reads_from_replica(request))
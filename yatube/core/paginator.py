@@ -0,0 +1,285 @@
+import base64
+import binascii
+import hashlib
+import json
+from datetime import datetime
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Model, Q
+from django.db.models.query import QuerySet
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from core.cache import generation_prefix
+
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class KeysetPage(Sequence):
+    def __init__(
+        self,
+        object_list: List[Model],
+        paginator: 'KeysetPaginator',
+        next_cursor: Optional[str] = None,
+        previous_cursor: Optional[str] = None,
+    ) -> None:
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self) -> str:
+        return f'<KeysetPage of {len(self)} objects>'
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __getitem__(self, index: Any) -> Any:
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Постраничный вывод по ключу (key_field, id) без COUNT(*) и OFFSET.
+
+    Вместо номера страницы используется непрозрачный курсор,
+    указывающий на крайний пост соседней страницы. Подходит и для
+    выборок values(), если в них есть key_field и id.
+    """
+
+    keyset = True
+
+    def __init__(
+        self,
+        queryset: QuerySet,
+        per_page: int,
+        key_field: str = 'pub_date',
+    ) -> None:
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.key_field = key_field
+
+    def key(self, obj: Union[Model, Dict[str, Any]]) -> Tuple[Any, int]:
+        if isinstance(obj, dict):
+            return obj[self.key_field], obj['id']
+        return getattr(obj, self.key_field), obj.pk
+
+    def encode_cursor(
+        self,
+        obj: Union[Model, Dict[str, Any]],
+        direction: str,
+    ) -> str:
+        value, pk = self.key(obj)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        raw = json.dumps((value, pk, direction)).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor: str) -> Tuple[Any, int, str]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            value, pk, direction = json.loads(raw)
+            if isinstance(value, str):
+                value = parse_datetime(value)
+            pk = int(pk)
+        except (binascii.Error, ValueError, TypeError) as error:
+            raise InvalidCursor(cursor) from error
+        if value is None or direction not in (FORWARD, BACKWARD):
+            raise InvalidCursor(cursor)
+        return value, pk, direction
+
+    def _seek(self, value: Any, pk: int, direction: str) -> QuerySet:
+        lookup = 'lt' if direction == FORWARD else 'gt'
+        order = '-' if direction == FORWARD else ''
+        return self.queryset.filter(
+            Q(**{f'{self.key_field}__{lookup}': value})
+            | Q(**{self.key_field: value, f'pk__{lookup}': pk}),
+        ).order_by(f'{order}{self.key_field}', f'{order}pk')
+
+    def page(self, cursor: Optional[str]) -> KeysetPage:
+        if not cursor:
+            rows = list(
+                self.queryset.order_by(f'-{self.key_field}', '-pk')[
+                    : self.per_page + 1
+                ],
+            )
+            return self._build(rows, has_next=len(rows) > self.per_page)
+
+        value, pk, direction = self.decode_cursor(cursor)
+        rows = list(self._seek(value, pk, direction)[: self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        if direction == FORWARD:
+            return self._build(rows, has_next=has_more, has_previous=True)
+        rows = rows[: self.per_page][::-1]
+        return self._build(rows, has_next=True, has_previous=has_more)
+
+    def get_page(self, cursor: Optional[str]) -> KeysetPage:
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page(None)
+
+    def _build(
+        self,
+        rows: List[Model],
+        has_next: bool,
+        has_previous: bool = False,
+    ) -> KeysetPage:
+        rows = rows[: self.per_page]
+        if not rows:
+            return KeysetPage(rows, self)
+        return KeysetPage(
+            rows,
+            self,
+            next_cursor=(
+                self.encode_cursor(rows[-1], FORWARD) if has_next else None
+            ),
+            previous_cursor=(
+                self.encode_cursor(rows[0], BACKWARD) if has_previous else None
+            ),
+        )
+
+
+def elided_page_range(
+    number: int,
+    num_pages: int,
+    on_each_side: int = 3,
+    on_ends: int = 2,
+) -> Iterator[Optional[int]]:
+    """
+    Номера страниц вокруг текущей и по краям; None на месте пропуска.
+
+    Повторяет Paginator.get_elided_page_range из Django 3.2.
+    """
+    if num_pages <= (on_each_side + on_ends) * 2:
+        yield from range(1, num_pages + 1)
+        return
+    if number > (1 + on_each_side + on_ends) + 1:
+        yield from range(1, on_ends + 1)
+        yield None
+        yield from range(number - on_each_side, number + 1)
+    else:
+        yield from range(1, number + 1)
+    if number < (num_pages - on_each_side - on_ends) - 1:
+        yield from range(number + 1, number + on_each_side + 1)
+        yield None
+        yield from range(num_pages - on_ends + 1, num_pages + 1)
+    else:
+        yield from range(number + 1, num_pages + 1)
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Нумерованный постраничный вывод с общим кэшем количества объектов.
+
+    Ключ кэша собирается из SQL выборки и поколений scopes, поэтому
+    COUNT(*) выполняется заново только после записи, которая увеличила
+    одно из поколений. С estimate=True для выборки без условий на
+    PostgreSQL вместо COUNT(*) берётся оценка pg_class.reltuples, если
+    она не меньше PAGINATOR_ESTIMATE_THRESHOLD.
+    """
+
+    def __init__(
+        self,
+        object_list: QuerySet,
+        per_page: int,
+        scopes: Iterable[str] = (),
+        estimate: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(object_list, per_page, **kwargs)
+        self.scopes = tuple(scopes)
+        self.estimate = estimate
+
+    def count_key(self) -> Optional[str]:
+        try:
+            sql, params = self.object_list.query.sql_with_params()
+        except EmptyResultSet:
+            return None
+        # Областей может быть много (лента подписок), поэтому поколения
+        # хешируются вместе с запросом, чтобы ключ оставался коротким.
+        raw = repr(
+            (
+                self.object_list.db,
+                sql,
+                params,
+                generation_prefix('count', self.scopes),
+            ),
+        )
+        return 'count.{}'.format(hashlib.md5(raw.encode()).hexdigest())
+
+    def estimated_count(self) -> Optional[int]:
+        query = self.object_list.query
+        connection = connections[self.object_list.db]
+        if (
+            not self.estimate
+            or connection.vendor != 'postgresql'
+            or query.where
+            or query.distinct
+            or not query.can_filter()
+        ):
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                [connection.ops.quote_name(query.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < settings.PAGINATOR_ESTIMATE_THRESHOLD:
+            return None
+        return int(row[0])
+
+    @cached_property
+    def count(self) -> int:
+        key = self.count_key()
+        if key is None:
+            return super().count
+        count = cache.get(key)
+        if count is None:
+            count = self.estimated_count()
+            if count is None:
+                count = super().count
+            cache.set(key, count)
+        return count
+
+    def get_elided_page_range(
+        self,
+        number: int = 1,
+        on_each_side: int = 3,
+        on_ends: int = 2,
+    ) -> Iterator[Optional[int]]:
+        return elided_page_range(
+            self.validate_number(number),
+            self.num_pages,
+            on_each_side,
+            on_ends,
+        )
@@ -0,0 +1,261 @@
+"""
+Пул соединений с базой данных внутри процесса.
+
+Django 2.2 умеет только держать одно соединение на поток (CONN_MAX_AGE).
+С пулом соединение, закрытое в конце запроса, возвращается в пул и
+достаётся следующему запросу любого потока без нового рукопожатия с
+сервером. Размер пула ограничен: когда все соединения заняты, поток
+ждёт свободное не дольше POOL['TIMEOUT'] секунд. Соединение, простоявшее
+в пуле дольше POOL['CHECK_INTERVAL'] секунд, перед выдачей проверяется
+запросом SELECT 1, а неисправное заменяется новым.
+
+Время ожидания и состояние пулов отдаются на /metrics/ вместе с
+остальными метриками.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from django.db.backends.base.base import NO_DB_ALIAS
+
+from core.metrics import DURATION_BUCKETS, Histogram
+
+POOL_METRICS = (
+    ('connections_idle', 'gauge', 'Свободные соединения', 'idle_count'),
+    ('connections_in_use', 'gauge', 'Занятые соединения', 'in_use'),
+    ('connects_total', 'counter', 'Открыто новых соединений', 'connects'),
+    (
+        'discarded_total',
+        'counter',
+        'Соединения, не прошедшие проверку',
+        'discarded',
+    ),
+    ('timeouts_total', 'counter', 'Соединение не дождались', 'timeouts'),
+)
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        size: int,
+        timeout: float = 10,
+        check_interval: float = 30,
+        check: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.check_interval = check_interval
+        self.check = check or ping
+        self.condition = threading.Condition()
+        self.idle: Deque[Tuple[Any, float]] = deque()
+        self.opened = 0
+        self.connects = 0
+        self.discarded = 0
+        self.timeouts = 0
+        self.waits = Histogram(DURATION_BUCKETS)
+
+    @property
+    def idle_count(self) -> int:
+        return len(self.idle)
+
+    @property
+    def in_use(self) -> int:
+        return self.opened - len(self.idle)
+
+    def acquire(self) -> Any:
+        started = time.monotonic()
+        deadline = started + self.timeout
+        with self.condition:
+            while not self.idle and self.opened >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        f'Все {self.size} соединений заняты',
+                    )
+                self.condition.wait(remaining)
+            if self.idle:
+                # Последнее возвращённое соединение ещё точно живо.
+                connection, released = self.idle.pop()
+            else:
+                connection, released = None, None
+                self.opened += 1
+            self.waits.observe(time.monotonic() - started)
+        if (
+            connection is not None
+            and time.monotonic() - released > self.check_interval
+            and not self.healthy(connection)
+        ):
+            self.discarded += 1
+            close_quietly(connection)
+            connection = None
+        if connection is None:
+            try:
+                connection = self.connect()
+            except Exception:
+                self.forget()
+                raise
+            self.connects += 1
+        return connection
+
+    def release(self, connection: Any) -> None:
+        try:
+            # Незавершённая транзакция не должна достаться другому потоку.
+            connection.rollback()
+        except Exception:
+            self.discard(connection)
+            return
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+
+    def discard(self, connection: Any) -> None:
+        close_quietly(connection)
+        self.forget()
+
+    def forget(self) -> None:
+        with self.condition:
+            self.opened -= 1
+            self.condition.notify()
+
+    def healthy(self, connection: Any) -> bool:
+        try:
+            self.check(connection)
+        except Exception:
+            return False
+        return True
+
+    def close(self) -> None:
+        """Закрывает свободные соединения; занятые закроются при возврате."""
+        with self.condition:
+            idle, self.idle = self.idle, deque()
+            self.opened -= len(idle)
+            self.condition.notify_all()
+        for connection, _ in idle:
+            close_quietly(connection)
+
+
+def ping(connection: Any) -> None:
+    cursor = connection.cursor()
+    try:
+        cursor.execute('SELECT 1')
+    finally:
+        cursor.close()
+
+
+def close_quietly(connection: Any) -> None:
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+_pools: Dict[Tuple[str, str], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(
+    alias: str,
+    name: str,
+    connect: Callable[[], Any],
+    options: Dict[str, Any],
+) -> ConnectionPool:
+    key = (alias, name)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(
+                connect,
+                size=options['SIZE'],
+                timeout=options.get('TIMEOUT', 10),
+                check_interval=options.get('CHECK_INTERVAL', 30),
+            )
+        return _pools[key]
+
+
+def close_pools(name: Optional[str] = None) -> None:
+    """Закрывает пулы к базе name, например перед её удалением."""
+    with _pools_lock:
+        pools = [
+            pool
+            for (_, pool_name), pool in _pools.items()
+            if name is None or pool_name == name
+        ]
+    for pool in pools:
+        pool.close()
+
+
+class PooledConnectionMixin:
+    """
+    Подмешивается к DatabaseWrapper бэкенда. Настройки пула берутся из
+    ключа POOL описания базы в settings.DATABASES.
+    """
+
+    def pool(self) -> Optional[ConnectionPool]:
+        options = self.settings_dict.get('POOL')
+        if not options or self.alias == NO_DB_ALIAS:
+            return None
+        return get_pool(
+            self.alias,
+            self.settings_dict['NAME'],
+            self.connect_directly,
+            options,
+        )
+
+    def connect_directly(self) -> Any:
+        return super().get_new_connection(self.get_connection_params())
+
+    def get_new_connection(self, conn_params: Dict[str, Any]) -> Any:
+        pool = self.pool()
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        return pool.acquire()
+
+    def _close(self) -> None:
+        pool = self.pool()
+        if pool is None or self.connection is None:
+            return super()._close()
+        if self.in_atomic_block:
+            # Django оставит ссылку на соединение до конца блока.
+            return pool.discard(self.connection)
+        return pool.release(self.connection)
+
+
+def render() -> str:
+    with _pools_lock:
+        pools = sorted(_pools.items())
+    lines: List[str] = [
+        '# HELP yatube_db_pool_wait_seconds Ожидание соединения из пула',
+        '# TYPE yatube_db_pool_wait_seconds histogram',
+    ]
+    for (alias, _), pool in pools:
+        with pool.condition:
+            for bound, count in pool.waits.cumulative():
+                lines.append(
+                    f'yatube_db_pool_wait_seconds_bucket'
+                    f'{{alias="{alias}",le="{bound}"}} {count}',
+                )
+            lines.append(
+                f'yatube_db_pool_wait_seconds_sum{{alias="{alias}"}} '
+                f'{pool.waits.sum}',
+            )
+            lines.append(
+                f'yatube_db_pool_wait_seconds_count{{alias="{alias}"}} '
+                f'{pool.waits.count}',
+            )
+    for metric, kind, description, attr in POOL_METRICS:
+        lines.append(f'# HELP yatube_db_pool_{metric} {description}')
+        lines.append(f'# TYPE yatube_db_pool_{metric} {kind}')
+        for (alias, _), pool in pools:
+            lines.append(
+                f'yatube_db_pool_{metric}{{alias="{alias}"}} '
+                f'{getattr(pool, attr)}',
+            )
+    return '\n'.join(lines) + '\n'
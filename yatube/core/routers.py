@@ -0,0 +1,62 @@
+"""
+Чтение с реплик базы данных.
+
+Реплики перечислены в settings.DATABASE_REPLICAS. Чтение уходит на
+случайную реплику только внутри представлений из REPLICA_VIEWS, флаг
+ставит ReplicaRoutingMiddleware. Всё остальное, в том числе любая
+запись, идёт на основную базу. После записи браузер какое-то время
+читает только с основной базы, чтобы не увидеть отставшую реплику.
+"""
+
+import random
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Model
+from django.http import HttpRequest
+
+STICKY_COOKIE = 'primary_reads'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+replica_reads: ContextVar[bool] = ContextVar('replica_reads', default=False)
+
+
+def writes(request: HttpRequest) -> bool:
+    match = request.resolver_match
+    return request.method not in SAFE_METHODS or (
+        match is not None and match.view_name in settings.PRIMARY_VIEWS
+    )
+
+
+def reads_from_replica(request: HttpRequest) -> bool:
+    match = request.resolver_match
+    return (
+        match is not None
+        and match.view_name in settings.REPLICA_VIEWS
+        and not writes(request)
+        and STICKY_COOKIE not in request.COOKIES
+    )
+
+
+class ReplicaRouter:
+    def db_for_read(self, model: Model, **hints) -> Optional[str]:
+        if (
+            settings.DATABASE_REPLICAS
+            and replica_reads.get()
+            and model._meta.app_label in settings.REPLICA_APPS
+        ):
+            return random.choice(settings.DATABASE_REPLICAS)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model: Model, **hints) -> str:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints) -> bool:
+        # На всех базах одни и те же данные.
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, **hints) -> bool:
+        # Реплики получают схему вместе с данными от основной базы.
+        return db not in settings.DATABASE_REPLICAS
@@ -0,0 +1,21 @@
+from django.template import TemplateDoesNotExist
+from django.template.backends import django as django_backend
+from django.template.backends.django import reraise
+
+from core.metrics import track_render
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        return track_render(super().render, context, request)
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,21 @@
+from typing import Optional
+
+from django import template
+from django.db.models import Model
+from sorl.thumbnail.images import ImageFile
+
+from core.thumbnails import ready_thumbnail
+
+register = template.Library()
+
+
+@register.simple_tag
+def cached_thumbnail(
+    obj: Model,
+    alias: str,
+    field: str = 'image',
+) -> Optional[ImageFile]:
+    resolved = getattr(obj, 'thumbnails', {})
+    if alias in resolved:
+        return resolved[alias]
+    return ready_thumbnail(getattr(obj, field), alias)
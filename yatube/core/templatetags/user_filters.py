@@ -1,7 +1,13 @@
+from typing import Iterator, Optional
+
 from django import template
+from django.conf import settings
+from django.core.paginator import Page
 from django.forms.boundfield import BoundField
 from django.utils.safestring import SafeText
 
+from core.paginator import elided_page_range
+
 register = template.Library()
 
 
@@ -12,3 +18,13 @@ def addclass(field: BoundField, css: SafeText) -> SafeText:
             'class': css,
         },
     )
+
+
+@register.filter
+def elided_pages(page: Page) -> Iterator[Optional[int]]:
+    return elided_page_range(
+        page.number,
+        page.paginator.num_pages,
+        settings.PAGINATOR_ON_EACH_SIDE,
+        settings.PAGINATOR_ON_ENDS,
+    )
@@ -0,0 +1,38 @@
+"""
+Настройки, которые подменяются на время тестов.
+
+Тесты чистят кэш, поэтому им нельзя давать общие файловые кэши сайта.
+Миниатюры строятся в потоке запроса: фоновый поток держал бы тестовую
+базу SQLite во время её очистки. Подмену включают TestRunner для
+manage.py test и фикстура в conftest.py для pytest.
+"""
+
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+TEST_SETTINGS = {
+    'CACHES': {
+        alias: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': f'tests-{alias}',
+            'TIMEOUT': timeout,
+        }
+        for alias, timeout in (('default', 60 * 60), ('state', None))
+    },
+    'THUMBNAIL_WORKERS': 0,
+}
+
+
+def test_settings() -> override_settings:
+    return override_settings(**TEST_SETTINGS)
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs) -> None:
+        super().setup_test_environment(**kwargs)
+        self.test_settings = test_settings()
+        self.test_settings.enable()
+
+    def teardown_test_environment(self, **kwargs) -> None:
+        self.test_settings.disable()
+        super().teardown_test_environment(**kwargs)
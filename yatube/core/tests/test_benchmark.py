@@ -0,0 +1,65 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+
+from core.benchmark import measure, percentile, run
+from posts.models import Post, SearchTerm, TimelineEntry, UserStats
+from posts.seeding import seed
+
+
+class BenchmarkTest(TestCase):
+    def test_percentile(self):
+        """Перцентиль считается по ближайшему рангу."""
+        values = [float(value) for value in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3.0], 99), 3)
+
+    def test_seed_fills_derived_data(self):
+        """Сгенерированные данные учтены в счётчиках, лентах и индексе."""
+        dataset = seed(users=5, groups=2, posts=20, comments=10, follows=6)
+        self.assertEqual(dataset['follows'], 6)
+        self.assertEqual(Post.objects.count(), 20)
+        self.assertEqual(
+            sum(UserStats.objects.values_list('posts_count', flat=True)),
+            20,
+        )
+        self.assertTrue(TimelineEntry.objects.exists())
+        self.assertTrue(SearchTerm.objects.exists())
+
+    def test_run_reports_all_scenarios(self):
+        """Замер возвращает метрики для каждого сценария."""
+        dataset = seed(users=5, groups=2, posts=20, comments=10, follows=6)
+        report = run(dataset, requests=3, warmup=1)
+        self.assertEqual(
+            set(report['results']),
+            {
+                'index',
+                'group_posts',
+                'profile',
+                'post_detail',
+                'follow_index',
+                'add_comment',
+                'api_index',
+                'api_group_posts',
+                'api_profile',
+                'api_post_detail',
+                'api_follow_index',
+                'db_connect',
+            },
+        )
+        for name, result in report['results'].items():
+            with self.subTest(name=name):
+                self.assertEqual(result['requests'], 3)
+                self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+
+    def test_run_keeps_site_cache(self):
+        """Замер чистит свои кэши, а не кэш сайта."""
+        dataset = seed(users=5, groups=2, posts=20, comments=10, follows=6)
+        cache.set('benchmark-test', 'value')
+        run(dataset, requests=1, warmup=0, only=['index'])
+        self.assertEqual(cache.get('benchmark-test'), 'value')
+
+    def test_measure_rejects_unexpected_status(self):
+        """Ответ с неожиданным кодом не засчитывается как замер."""
+        with self.assertRaises(RuntimeError):
+            measure(Client(), 'get', '/unexisting_page/', None, 1, 0)
@@ -0,0 +1,28 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TransactionTestCase
+
+from core.cache import bump_generation, get_generation
+
+
+class BumpGenerationTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bumped_again_after_commit(self):
+        """Внутри транзакции номер увеличивается ещё раз после коммита."""
+        start = get_generation('posts')
+        with transaction.atomic():
+            bump_generation('posts')
+            self.assertEqual(get_generation('posts'), start + 1)
+        self.assertEqual(get_generation('posts'), start + 2)
+
+    def test_not_bumped_again_after_rollback(self):
+        start = get_generation('posts')
+        with self.assertRaises(ZeroDivisionError):
+            with transaction.atomic():
+                bump_generation('posts')
+                1 / 0
+        self.assertEqual(get_generation('posts'), start + 1)
+        bump_generation('posts')
+        self.assertEqual(get_generation('posts'), start + 2)
@@ -0,0 +1,125 @@
+import threading
+
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, TransactionTestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from core.concurrency import gather
+
+User = get_user_model()
+
+
+class GatherTest(TestCase):
+    def test_sequential_without_workers(self):
+        """Без пула вызовы выполняются по порядку в текущем потоке."""
+        current = threading.current_thread()
+        self.assertEqual(
+            gather(
+                lambda: (1, threading.current_thread()),
+                lambda: (2, threading.current_thread()),
+            ),
+            ((1, current), (2, current)),
+        )
+
+    @override_settings(VIEW_QUERY_WORKERS=2)
+    def test_pool_keeps_order_and_errors(self):
+        """В пуле результаты идут по порядку, ошибка пробрасывается."""
+        current = threading.current_thread()
+        first, second = gather(
+            threading.current_thread,
+            threading.current_thread,
+        )
+        self.assertIs(first, current)
+        self.assertIsNot(second, current)
+        with self.assertRaises(ZeroDivisionError):
+            gather(lambda: None, lambda: 1 / 0)
+
+
+@override_settings(VIEW_QUERY_WORKERS=2)
+class ParallelViewsTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = mixer.blend(User, username='TestUser')
+        self.group = mixer.blend('posts.Group', slug='test-slug')
+        self.post = mixer.blend(
+            'posts.Post',
+            author=self.user,
+            group=self.group,
+        )
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_read_views(self):
+        """Страницы собираются из данных, полученных в пуле потоков."""
+        pages = {
+            reverse('posts:profile', args=(self.user.username,)): 'author',
+            reverse('posts:group_list', args=(self.group.slug,)): 'group',
+            reverse('posts:post_detail', args=(self.post.pk,)): 'post',
+        }
+        for url, key in pages.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIsNotNone(response.context[key])
+        response = self.client.get(
+            reverse('posts:profile', args=(self.user.username,)),
+        )
+        self.assertEqual(list(response.context['page_obj']), [self.post])
+        self.assertFalse(response.context['following'])
+
+    def test_pages_evaluated_in_pool(self):
+        """Страницы из пула приходят в шаблон уже выбранными из БД."""
+        urls = {
+            reverse('posts:profile', args=(self.user.username,)): 'page_obj',
+            reverse('posts:post_detail', args=(self.post.pk,)): 'comments',
+        }
+        for url, key in urls.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIsInstance(response.context[key].object_list, list)
+
+    def test_missing_objects(self):
+        """Отсутствующий объект даёт 404 и при параллельной выборке."""
+        urls = (
+            reverse('posts:profile', args=('nobody',)),
+            reverse('posts:group_list', args=('nothing',)),
+            reverse('posts:post_detail', args=(self.post.pk + 100,)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+
+class AsgiApplicationTest(TransactionTestCase):
+    def test_http_request(self):
+        """ASGI-приложение отвечает на HTTP-запрос."""
+        from yatube.asgi import application
+
+        cache.clear()
+
+        async def request():
+            communicator = ApplicationCommunicator(
+                application,
+                {
+                    'type': 'http',
+                    'http_version': '1.1',
+                    'method': 'GET',
+                    'path': reverse('posts:index'),
+                    'query_string': b'',
+                    'headers': [(b'host', b'testserver')],
+                    'server': ('testserver', 80),
+                },
+            )
+            await communicator.send_input({'type': 'http.request'})
+            start = await communicator.receive_output(timeout=10)
+            body = await communicator.receive_output(timeout=10)
+            return start, body
+
+        start, body = async_to_sync(request)()
+        self.assertEqual(start['status'], 200)
+        self.assertIn('Последние обновления'.encode(), body['body'])
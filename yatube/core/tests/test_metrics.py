@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from core.metrics import registry
+
+User = get_user_model()
+
+
+class MetricsMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = mixer.blend(User, username='TestUser')
+        mixer.cycle(3).blend('posts.Post', author=cls.user)
+
+        cls.anon = Client()
+        cls.staff_client = Client()
+        cls.staff_client.force_login(
+            mixer.blend(User, username='Staff', is_staff=True),
+        )
+
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+
+    def test_server_timing_header(self):
+        """Ответ содержит заголовок Server-Timing."""
+        response = self.anon.get(
+            reverse('posts:profile', args=(self.user.username,)),
+        )
+        timing = response['Server-Timing']
+        for part in ('db;desc=', 'tpl;dur=', 'total;dur='):
+            with self.subTest(part=part):
+                self.assertIn(part, timing)
+        self.assertNotIn('db;desc="0 queries"', timing)
+
+    def test_metrics_collected_per_view(self):
+        """Метрики копятся по имени URL и отдаются в формате Prometheus."""
+        self.anon.get(reverse('posts:profile', args=(self.user.username,)))
+        self.anon.get(reverse('posts:profile', args=(self.user.username,)))
+        body = self.staff_client.get(reverse('metrics')).content.decode()
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:profile"} 2',
+            body,
+        )
+        self.assertIn('# TYPE yatube_db_queries histogram', body)
+        self.assertIn(
+            'yatube_template_duration_seconds_bucket'
+            '{view="posts:profile",le="+Inf"} 2',
+            body,
+        )
+
+    def test_metrics_hidden_from_outside(self):
+        """Метрики недоступны без токена даже с адреса прокси."""
+        response = self.anon.get(reverse('metrics'), REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        """Сборщик метрик получает их по токену из настроек."""
+        for header, status in (
+            ('Bearer secret', 200),
+            ('Bearer wrong', 404),
+        ):
+            with self.subTest(header=header):
+                response = self.anon.get(
+                    reverse('metrics'),
+                    HTTP_AUTHORIZATION=header,
+                )
+                self.assertEqual(response.status_code, status)
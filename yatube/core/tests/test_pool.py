@@ -0,0 +1,115 @@
+import os
+import tempfile
+import threading
+
+from django.db import connections
+from django.db.backends.sqlite3 import base as sqlite3
+from django.test import SimpleTestCase
+
+from core import pool
+from core.pool import ConnectionPool, PooledConnectionMixin, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def rollback(self):
+        if self.closed:
+            raise RuntimeError('closed')
+
+    def close(self):
+        self.closed = True
+
+
+class PooledWrapper(PooledConnectionMixin, sqlite3.DatabaseWrapper):
+    pass
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    def test_released_connection_is_reused(self):
+        """Возвращённое соединение выдаётся снова без подключения."""
+        connection_pool = ConnectionPool(FakeConnection, size=2)
+        first = connection_pool.acquire()
+        connection_pool.release(first)
+        self.assertIs(connection_pool.acquire(), first)
+        self.assertEqual(connection_pool.connects, 1)
+        self.assertEqual(connection_pool.in_use, 1)
+
+    def test_waits_for_free_connection(self):
+        """Когда пул исчерпан, поток ждёт освободившееся соединение."""
+        connection_pool = ConnectionPool(FakeConnection, size=1, timeout=5)
+        first = connection_pool.acquire()
+        timer = threading.Timer(0.05, connection_pool.release, (first,))
+        timer.start()
+        self.assertIs(connection_pool.acquire(), first)
+        timer.join()
+        self.assertEqual(connection_pool.waits.count, 2)
+        self.assertGreater(connection_pool.waits.sum, 0)
+
+    def test_timeout(self):
+        connection_pool = ConnectionPool(
+            FakeConnection,
+            size=1,
+            timeout=0.01,
+        )
+        connection_pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            connection_pool.acquire()
+        self.assertEqual(connection_pool.timeouts, 1)
+
+    def test_unhealthy_connection_replaced(self):
+        """Соединение, не прошедшее проверку, заменяется новым."""
+
+        def check(connection):
+            if connection.closed:
+                raise RuntimeError('closed')
+
+        connection_pool = ConnectionPool(
+            FakeConnection,
+            size=1,
+            check_interval=0,
+            check=check,
+        )
+        first = connection_pool.acquire()
+        connection_pool.release(first)
+        first.closed = True
+        second = connection_pool.acquire()
+        self.assertIsNot(second, first)
+        self.assertEqual(connection_pool.discarded, 1)
+        self.assertEqual(connection_pool.opened, 1)
+
+
+class PooledBackendTest(SimpleTestCase):
+    def setUp(self):
+        handle, name = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        self.addCleanup(os.remove, name)
+        self.addCleanup(pool.close_pools, name)
+        settings_dict = dict(
+            connections.databases['default'],
+            NAME=name,
+            POOL={'SIZE': 2},
+        )
+        self.wrapper = PooledWrapper(settings_dict, alias='pooled')
+
+    def test_close_returns_connection_to_pool(self):
+        """Закрытое соединение Django остаётся открытым в пуле."""
+        self.wrapper.ensure_connection()
+        raw = self.wrapper.connection
+        self.wrapper.close()
+        self.assertIsNone(self.wrapper.connection)
+        self.wrapper.ensure_connection()
+        self.assertIs(self.wrapper.connection, raw)
+        with self.wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        self.wrapper.close()
+        metrics = pool.render()
+        self.assertIn(
+            'yatube_db_pool_connects_total{alias="pooled"} 1',
+            metrics,
+        )
+        self.assertIn(
+            'yatube_db_pool_wait_seconds_count{alias="pooled"} 2',
+            metrics,
+        )
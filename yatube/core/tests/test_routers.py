@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve, reverse
+
+from core.middleware import ReplicaRoutingMiddleware
+from core.routers import STICKY_COOKIE, ReplicaRouter
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica0', 'replica1'])
+class ReplicaRoutingTest(TestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def handle(self, method, path, cookies=None):
+        """Прогоняет запрос через middleware и запоминает выбор базы."""
+        request = getattr(self.factory, method)(path)
+        request.COOKIES.update(cookies or {})
+        request.resolver_match = resolve(path)
+        chosen = {}
+
+        def view(request):
+            middleware.process_view(request, None, (), {})
+            for model in (Post, User, Session):
+                chosen[model] = self.router.db_for_read(model)
+            chosen['write'] = self.router.db_for_write(Post)
+            return HttpResponse()
+
+        middleware = ReplicaRoutingMiddleware(view)
+        return middleware(request), chosen
+
+    def test_read_views_use_replicas(self):
+        """Страницы чтения читают посты и пользователей с реплик."""
+        response, chosen = self.handle('get', reverse('posts:index'))
+        self.assertIn(chosen[Post], ('replica0', 'replica1'))
+        self.assertIn(chosen[User], ('replica0', 'replica1'))
+        self.assertEqual(chosen[Session], 'default')
+        self.assertEqual(chosen['write'], 'default')
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_writes_use_primary_and_stick(self):
+        """Запись идёт на основную базу и закрепляет за ней чтение."""
+        post = Post.objects.create(
+            author=User.objects.create(username='TestUser'),
+            text='Пост',
+        )
+        for method, path in (
+            ('post', reverse('posts:add_comment', args=(post.pk,))),
+            ('get', reverse('posts:profile_follow', args=('TestUser',))),
+        ):
+            with self.subTest(path=path):
+                response, chosen = self.handle(method, path)
+                self.assertEqual(chosen[Post], 'default')
+                self.assertIn(STICKY_COOKIE, response.cookies)
+        _, chosen = self.handle(
+            'get',
+            reverse('posts:post_detail', args=(post.pk,)),
+            cookies={STICKY_COOKIE: '1'},
+        )
+        self.assertEqual(chosen[Post], 'default')
+
+    def test_other_views_use_primary(self):
+        """Страницы вне REPLICA_VIEWS читают с основной базы."""
+        _, chosen = self.handle('get', reverse('posts:search'))
+        self.assertEqual(chosen[Post], 'default')
+
+    def test_migrations_only_on_primary(self):
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica0', 'posts'))
@@ -0,0 +1,168 @@
+"""
+Фоновая подготовка миниатюр sorl-thumbnail.
+
+Размеры миниатюр задаются в settings.THUMBNAIL_ALIASES. После загрузки
+картинки все миниатюры строятся в пуле потоков, а шаблоны только
+проверяют хранилище ключей и до готовности показывают заглушку.
+"""
+
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.dispatch import Signal
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores import cached_db_kvstore
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.models import KVStore as KVStoreModel
+
+from core.uploads import shrink_original
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[Executor] = None
+
+# Отправляется, когда все миниатюры картинки готовы.
+thumbnails_ready = Signal(providing_args=['name'])
+
+
+class LookupThumbnailBackend(ThumbnailBackend):
+    def resolve_options(self, source: ImageFile, options: Dict) -> Dict:
+        options = dict(options)
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        return options
+
+    def thumbnail_file(
+        self,
+        file_,
+        geometry_string: str,
+        **options,
+    ) -> ImageFile:
+        source = ImageFile(file_)
+        name = self._get_thumbnail_filename(
+            source,
+            geometry_string,
+            self.resolve_options(source, options),
+        )
+        return ImageFile(name, default.storage)
+
+    def get_cached(
+        self,
+        file_,
+        geometry_string: str,
+        **options,
+    ) -> Optional[ImageFile]:
+        return default.kvstore.get(
+            self.thumbnail_file(file_, geometry_string, **options),
+        )
+
+
+backend = LookupThumbnailBackend()
+
+
+def get_alias(alias: str) -> Tuple[str, Dict]:
+    return settings.THUMBNAIL_ALIASES[alias]
+
+
+def ready_thumbnail(file_, alias: str) -> Optional[ImageFile]:
+    if not file_:
+        return None
+    geometry, options = get_alias(alias)
+    return backend.get_cached(file_, geometry, **options)
+
+
+def get_many_raw(keys: List[str]) -> Dict[str, str]:
+    kvstore = default.kvstore
+    if not isinstance(kvstore, cached_db_kvstore.KVStore):
+        values = {key: kvstore._get_raw(key) for key in keys}
+        return {key: value for key, value in values.items() if value}
+
+    empty = cached_db_kvstore.EMPTY_VALUE
+    found = kvstore.cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        stored = dict(
+            KVStoreModel.objects.filter(key__in=missing).values_list(
+                'key',
+                'value',
+            ),
+        )
+        kvstore.cache.set_many(
+            {key: stored.get(key, empty) for key in missing},
+            thumbnail_settings.THUMBNAIL_CACHE_TIMEOUT,
+        )
+        found.update(stored)
+    return {key: value for key, value in found.items() if value != empty}
+
+
+def resolve_thumbnails(
+    objects: Iterable,
+    alias: str,
+    field: str = 'image',
+) -> Iterable:
+    """
+    Находит готовые миниатюры для всех объектов страницы одним запросом
+    к хранилищу и сохраняет их в obj.thumbnails[alias].
+    """
+    geometry, options = get_alias(alias)
+    keys = {}
+    for obj in objects:
+        obj.thumbnails = getattr(obj, 'thumbnails', {})
+        obj.thumbnails[alias] = None
+        file_ = getattr(obj, field)
+        if file_:
+            thumbnail = backend.thumbnail_file(file_, geometry, **options)
+            keys.setdefault(add_prefix(thumbnail.key), []).append(obj)
+    for key, value in get_many_raw(list(keys)).items():
+        thumbnail = deserialize_image_file(value)
+        for obj in keys[key]:
+            obj.thumbnails[alias] = thumbnail
+    return objects
+
+
+def generate(name: str) -> None:
+    try:
+        name = shrink_original(name)
+        for geometry, options in settings.THUMBNAIL_ALIASES.values():
+            backend.get_thumbnail(name, geometry, **options)
+        thumbnails_ready.send(sender=None, name=name)
+    except Exception:
+        logger.exception('Не удалось подготовить миниатюры для %s', name)
+    finally:
+        close_old_connections()
+
+
+def get_executor() -> Optional[Executor]:
+    global _executor
+    if not settings.THUMBNAIL_WORKERS:
+        return None
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS,
+            thread_name_prefix='thumbnails',
+        )
+    return _executor
+
+
+def schedule(file_) -> None:
+    if not file_:
+        return
+    executor = get_executor()
+    if executor is None:
+        generate(file_.name)
+    else:
+        name = file_.name
+        transaction.on_commit(lambda: executor.submit(generate, name))
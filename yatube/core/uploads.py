@@ -0,0 +1,150 @@
+"""
+Потоковая загрузка картинок.
+
+Файлы сразу пишутся во временный файл на диске, размер проверяется по
+мере поступления данных, а формат и размеры картинки читаются только из
+заголовка. Слишком большие файлы отбрасываются, не дойдя до диска, а
+форма получает вместо них RejectedUploadedFile с текстом ошибки.
+Обработчик подключается только к представлениям с загрузкой картинок
+через декоратор limited_image_uploads, остальные запросы разбираются
+обработчиками Django по умолчанию.
+"""
+
+from functools import wraps
+from io import BytesIO
+from typing import Callable, Optional, Tuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.dispatch import Signal
+from django.http import HttpRequest, HttpResponse
+from django.template.defaultfilters import filesizeformat
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image
+
+HEADER_SIZE = 64 * 1024
+
+original_replaced = Signal(providing_args=['name', 'new_name'])
+
+
+class ImageInfo:
+    def __init__(self, image_format: str, size: Tuple[int, int]) -> None:
+        self.format = image_format
+        self.size = size
+
+
+class RejectedUploadedFile(UploadedFile):
+    def __init__(self, name: str, size: int, error: str) -> None:
+        super().__init__(BytesIO(), name=name, size=size)
+        self.upload_error = error
+
+
+def read_image_info(header: bytes) -> Optional[ImageInfo]:
+    try:
+        with Image.open(BytesIO(header)) as image:
+            return ImageInfo(image.format, image.size)
+    except Exception:
+        return None
+
+
+def check_image_info(info: ImageInfo) -> Optional[str]:
+    if info.format not in settings.IMAGE_ALLOWED_FORMATS:
+        return f'Формат {info.format} не поддерживается'
+    max_width, max_height = settings.IMAGE_MAX_DIMENSIONS
+    width, height = info.size
+    if width > max_width or height > max_height:
+        return (
+            f'Картинка {width}x{height} больше допустимых '
+            f'{max_width}x{max_height}'
+        )
+    return None
+
+
+class LimitedImageUploadHandler(TemporaryFileUploadHandler):
+    def new_file(self, *args, **kwargs) -> None:
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.header = b''
+        self.image_info = None
+        self.error = None
+        if (
+            self.content_length
+            and self.content_length > settings.MAX_UPLOAD_SIZE
+        ):
+            self.reject_size()
+
+    def reject_size(self) -> None:
+        self.error = f'Файл больше {filesizeformat(settings.MAX_UPLOAD_SIZE)}'
+
+    def receive_data_chunk(self, raw_data: bytes, start: int) -> None:
+        if self.error:
+            return None
+        self.received += len(raw_data)
+        if self.received > settings.MAX_UPLOAD_SIZE:
+            self.reject_size()
+            return None
+        if self.image_info is None and len(self.header) < HEADER_SIZE:
+            self.header += raw_data[: HEADER_SIZE - len(self.header)]
+            self.image_info = read_image_info(self.header)
+            if self.image_info is not None:
+                self.error = check_image_info(self.image_info)
+                if self.error:
+                    return None
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size: int) -> UploadedFile:
+        if self.error:
+            self.file.close()
+            return RejectedUploadedFile(
+                self.file_name,
+                self.received,
+                self.error,
+            )
+        return super().file_complete(file_size)
+
+
+def limited_image_uploads(
+    view: Callable[..., HttpResponse],
+) -> Callable[..., HttpResponse]:
+    """
+    Разбирает файлы запроса через LimitedImageUploadHandler.
+
+    Обработчик нужно добавить до первого чтения request.POST, а его
+    читает CsrfViewMiddleware. Поэтому middleware пропускает
+    представление, а CSRF-токен проверяется уже после подмены.
+    """
+    protected = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request: HttpRequest, *args, **kwargs) -> HttpResponse:
+        request.upload_handlers.insert(0, LimitedImageUploadHandler(request))
+        return protected(request, *args, **kwargs)
+
+    return wrapper
+
+
+def shrink_original(name: str) -> str:
+    """
+    Уменьшает слишком большой оригинал и возвращает имя, под которым
+    теперь лежит картинка. Копия сохраняется под новым именем, и только
+    после того как на неё переключились владельцы файла, старый файл
+    удаляется: сбой записи не оставит пост без картинки.
+    """
+    max_side = settings.IMAGE_MAX_SIDE
+    with default_storage.open(name) as source:
+        image = Image.open(source)
+        if max(image.size) <= max_side or getattr(image, 'is_animated', False):
+            return name
+        image_format = image.format
+        image.thumbnail((max_side, max_side))
+        content = BytesIO()
+        image.save(content, format=image_format)
+    new_name = default_storage.save(name, ContentFile(content.getvalue()))
+    if new_name != name:
+        original_replaced.send(sender=None, name=name, new_name=new_name)
+        default_storage.delete(name)
+    return new_name
@@ -1,15 +1,56 @@
+from typing import Iterable, Optional, Union
+
 from django.conf import settings
-from django.core.paginator import Paginator
+from django.core.paginator import Page, Paginator
 from django.db.models.query import QuerySet
 from django.http import HttpRequest
 
+from core.paginator import CachedCountPaginator, KeysetPage, KeysetPaginator
+
+
+def uses_keyset(request: HttpRequest) -> bool:
+    match = request.resolver_match
+    return (
+        match is not None
+        and match.view_name in settings.KEYSET_PAGINATED_VIEWS
+    )
+
 
 def paginate(
     request: HttpRequest,
     queryset: QuerySet,
     objects_num: int = settings.POSTS_QUANTITY,
-) -> Paginator:
-    return Paginator(queryset, objects_num).get_page(request.GET.get('page'))
+    keyset: Optional[bool] = None,
+    count_scopes: Optional[Iterable[str]] = None,
+    estimate: bool = False,
+) -> Union[Page, KeysetPage]:
+    if keyset is None:
+        keyset = uses_keyset(request)
+    if keyset:
+        return KeysetPaginator(queryset, objects_num).get_page(
+            request.GET.get('cursor'),
+        )
+    if count_scopes is None:
+        paginator = Paginator(queryset, objects_num)
+    else:
+        paginator = CachedCountPaginator(
+            queryset,
+            objects_num,
+            scopes=count_scopes,
+            estimate=estimate,
+        )
+    return paginator.get_page(request.GET.get('page'))
+
+
+def evaluate_page(page: Union[Page, KeysetPage]) -> Union[Page, KeysetPage]:
+    """
+    Выполняет запрос страницы сразу, а не при выводе в шаблоне.
+
+    Нужна для страниц, которые собираются в пуле core.concurrency.gather:
+    ленивый queryset иначе выполнился бы уже в потоке запроса.
+    """
+    page.object_list = list(page.object_list)
+    return page
 
 
 def truncatechars(
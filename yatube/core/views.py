@@ -1,8 +1,13 @@
 from http import HTTPStatus
 
+from django.conf import settings
 from django.core import exceptions
-from django.http import HttpRequest, HttpResponse
+from django.http import Http404, HttpRequest, HttpResponse
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+
+from core import pool
+from core.metrics import registry
 
 
 def page_not_found(
@@ -31,8 +36,13 @@ def permission_denied(request: HttpRequest, *args: exceptions) -> HttpResponse:
     )
 
 
-def csrf_failure(request: HttpRequest, *args: exceptions) -> HttpResponse:
-    return render(request, 'core/403csrf.html')
+def csrf_failure(request: HttpRequest, reason: str = '') -> HttpResponse:
+    del reason
+    return render(
+        request,
+        'core/403csrf.html',
+        status=HTTPStatus.FORBIDDEN,
+    )
 
 
 def server_error(request: HttpRequest, *args: exceptions) -> HttpResponse:
@@ -44,3 +54,23 @@ def server_error(request: HttpRequest, *args: exceptions) -> HttpResponse:
         },
         status=HTTPStatus.INTERNAL_SERVER_ERROR,
     )
+
+
+def has_metrics_token(request: HttpRequest) -> bool:
+    # За обратным прокси все запросы приходят с 127.0.0.1, поэтому
+    # доступ определяется токеном, а не адресом.
+    if not settings.METRICS_TOKEN:
+        return False
+    return constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''),
+        f'Bearer {settings.METRICS_TOKEN}',
+    )
+
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    if not request.user.is_staff and not has_metrics_token(request):
+        raise Http404
+    return HttpResponse(
+        registry.render() + pool.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
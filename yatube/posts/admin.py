@@ -2,6 +2,7 @@ from django.contrib import admin
 
 from core.admin import BaseAdmin
 from posts.models import Comment, Follow, Group, Post
+from posts.search import search_posts
 
 
 @admin.register(Post)
@@ -17,6 +18,12 @@ class PostAdmin(BaseAdmin):
     search_fields = ('text',)
     list_filter = ('pub_date',)
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        found = search_posts(search_term).values('pk')
+        return queryset.filter(pk__in=found), False
+
 
 @admin.register(Group)
 class GroupAdmin(BaseAdmin):
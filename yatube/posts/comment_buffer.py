@@ -0,0 +1,210 @@
+"""
+Отложенная запись комментариев.
+
+При COMMENT_WRITE_BEHIND комментарии после проверки формы попадают в
+буфер процесса. Фоновый поток записывает их одним bulk_create каждые
+COMMENT_FLUSH_INTERVAL мс или сразу после набора COMMENT_BUFFER_SIZE
+штук, а счётчики, рейтинг и версии постов обновляются по одному разу
+на пост. При штатной остановке процесса буфер сбрасывается через atexit.
+
+Пока комментарий не записан, автор видит его на странице поста:
+ожидающие записи комментарии хранятся в общем кэше state, поэтому они
+видны из любого процесса.
+"""
+
+import atexit
+import logging
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, close_old_connections, transaction
+from django.utils import timezone
+
+from core.cache import bump_generation, state_cache
+from posts import counters, trending, versions
+from posts.models import Comment
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = 'pending_comments:{}'
+PENDING_ENTRY_KEY = 'pending_comments:{}:{}'
+# Запись, которую не убрал упавший процесс, не должна висеть вечно.
+PENDING_TIMEOUT = 60 * 60
+
+
+def pending_for(
+    user: User,
+    post_id: int,
+    saved: Iterable[Comment] = (),
+) -> List[Comment]:
+    """
+    Ещё не записанные комментарии пользователя к посту, новые первыми.
+
+    Просматриваются последние COMMENTS_QUANTITY записей пользователя.
+    Между bulk_create и forget комментарий уже есть в saved (первая
+    страница комментариев), и такая запись пропускается.
+    """
+    if not settings.COMMENT_WRITE_BEHIND or not user.is_authenticated:
+        return []
+    cache = state_cache()
+    last = cache.get(PENDING_KEY.format(user.pk))
+    if not last:
+        return []
+    first = max(last - settings.COMMENTS_QUANTITY, 0) + 1
+    keys = [
+        PENDING_ENTRY_KEY.format(user.pk, number)
+        for number in range(last, first - 1, -1)
+    ]
+    entries = cache.get_many(keys)
+    unmatched = [comment for comment in saved if comment.author_id == user.pk]
+    pending = []
+    for key in keys:
+        if key not in entries:
+            continue
+        entry_post_id, text, queued = entries[key]
+        if entry_post_id != post_id:
+            continue
+        match = next(
+            (
+                comment
+                for comment in unmatched
+                if comment.text == text and comment.created >= queued
+            ),
+            None,
+        )
+        if match is None:
+            pending.append(Comment(post_id=post_id, author=user, text=text))
+        else:
+            unmatched.remove(match)
+    return pending
+
+
+def remember(comment: Comment) -> None:
+    """
+    Кладёт комментарий в общий кэш отдельной записью под очередным
+    номером пользователя: add и incr атомарны, поэтому запросы разных
+    процессов не затирают записи друг друга.
+    """
+    cache = state_cache()
+    sequence = PENDING_KEY.format(comment.author_id)
+    cache.add(sequence, 0, None)
+    comment.pending_key = PENDING_ENTRY_KEY.format(
+        comment.author_id,
+        cache.incr(sequence),
+    )
+    cache.set(
+        comment.pending_key,
+        (comment.post_id, comment.text, timezone.now()),
+        PENDING_TIMEOUT,
+    )
+
+
+def forget(comments: List[Comment]) -> None:
+    state_cache().delete_many(
+        [comment.pending_key for comment in comments],
+    )
+
+
+def applied(comments: List[Comment]) -> None:
+    """
+    Обновляет то же, что сигналы post_save для каждого комментария,
+    но одним запросом на пост.
+    """
+    added = Counter(comment.post_id for comment in comments)
+    scores: Dict[int, List[float]] = defaultdict(list)
+    for comment in comments:
+        scores[comment.post_id].append(
+            trending.event_score(comment.created, trending.COMMENT_WEIGHT),
+        )
+    for post_id, count in added.items():
+        counters.bump_post(post_id, count)
+        trending.add_score(post_id, trending.combine(scores[post_id]))
+    bump_generation(*(versions.post_scope(post_id) for post_id in added))
+
+
+class CommentBuffer:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.pending: List[Comment] = []
+        self.thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def add(self, comment: Comment) -> None:
+        remember(comment)
+        with self.lock:
+            self.pending.append(comment)
+            full = len(self.pending) >= settings.COMMENT_BUFFER_SIZE
+            if self.thread is None:
+                self.start()
+        # Страница поста должна перестать отвечать 304 ещё до записи.
+        bump_generation(versions.post_scope(comment.post_id))
+        if full:
+            self.wakeup.set()
+
+    def start(self) -> None:
+        self.thread = threading.Thread(
+            target=self.run,
+            name='comment-buffer',
+            daemon=True,
+        )
+        self.thread.start()
+        atexit.register(self.flush)
+
+    def run(self) -> None:
+        while True:
+            self.wakeup.wait(settings.COMMENT_FLUSH_INTERVAL / 1000)
+            self.wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Не удалось записать комментарии')
+            finally:
+                close_old_connections()
+
+    def flush(self) -> int:
+        with self.flush_lock:
+            with self.lock:
+                batch, self.pending = self.pending, []
+            if not batch:
+                return 0
+            saved = self.write(batch)
+            if saved:
+                applied(saved)
+            forget(batch)
+            return len(saved)
+
+    def write(self, batch: List[Comment]) -> List[Comment]:
+        try:
+            with transaction.atomic():
+                Comment.objects.bulk_create(batch)
+            return batch
+        except DatabaseError:
+            # Например, пост удалили, пока комментарий ждал в буфере:
+            # остальные комментарии пачки записываются по одному.
+            logger.exception('Пачка комментариев не записана целиком')
+        saved = []
+        for comment in batch:
+            comment.pk = None
+            try:
+                with transaction.atomic():
+                    Comment.objects.bulk_create([comment])
+            except DatabaseError:
+                logger.exception(
+                    'Комментарий к посту %s не записан',
+                    comment.post_id,
+                )
+            else:
+                saved.append(comment)
+        return saved
+
+
+comment_buffer = CommentBuffer()
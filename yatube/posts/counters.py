@@ -0,0 +1,186 @@
+"""
+Денормализованные счётчики постов, комментариев, подписок и групп.
+
+Счётчики меняются атомарным UPDATE с F-выражением в той же транзакции,
+что и запись, а reconcile() и reconcile_groups() пересчитывают их из
+исходных таблиц.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import (
+    Count,
+    F,
+    IntegerField,
+    Max,
+    OuterRef,
+    Q,
+    Subquery,
+)
+from django.db.models.functions import Coalesce
+
+from posts.models import (
+    Comment,
+    Follow,
+    Group,
+    GroupAuthorStats,
+    GroupStats,
+    Post,
+    UserStats,
+)
+
+User = get_user_model()
+
+
+def bump_user(user_id: int, create: bool = True, **deltas: int) -> None:
+    if create:
+        UserStats.objects.get_or_create(user_id=user_id)
+    UserStats.objects.filter(
+        user_id=user_id,
+        **{
+            f'{field}__gte': -delta
+            for field, delta in deltas.items()
+            if delta < 0
+        },
+    ).update(**{field: F(field) + delta for field, delta in deltas.items()})
+
+
+def bump_post(post_id: int, delta: int) -> None:
+    Post.objects.filter(
+        pk=post_id,
+        comments_count__gte=max(-delta, 0),
+    ).update(comments_count=F('comments_count') + delta)
+
+
+def _top_authors(author_stats, group_id: int) -> str:
+    return ','.join(
+        author_stats.filter(group_id=group_id, posts_count__gt=0)
+        .order_by('-posts_count', 'author_id')
+        .values_list('author__username', flat=True)[
+            : settings.GROUP_TOP_AUTHORS
+        ],
+    )
+
+
+def bump_group(
+    group_id: int,
+    author_id: int,
+    delta: int,
+    activity: Optional[datetime] = None,
+) -> None:
+    """
+    Учитывает появление (delta=1) или уход (delta=-1) поста автора
+    в группе. activity — дата публикации нового поста; при уходе поста
+    дата последней публикации берётся из оставшихся постов.
+    """
+    if delta > 0:
+        GroupStats.objects.get_or_create(group_id=group_id)
+        GroupAuthorStats.objects.get_or_create(
+            group_id=group_id,
+            author_id=author_id,
+        )
+    authors = GroupAuthorStats.objects.filter(
+        group_id=group_id,
+        author_id=author_id,
+    )
+    authors.filter(posts_count__gte=max(-delta, 0)).update(
+        posts_count=F('posts_count') + delta,
+    )
+    authors.filter(posts_count=0).delete()
+
+    stats = GroupStats.objects.filter(group_id=group_id)
+    stats.filter(posts_count__gte=max(-delta, 0)).update(
+        posts_count=F('posts_count') + delta,
+    )
+    if activity is not None:
+        stats.filter(
+            Q(last_activity__isnull=True) | Q(last_activity__lt=activity),
+        ).update(last_activity=activity)
+    if delta < 0:
+        stats.update(
+            last_activity=Post.objects.filter(group_id=group_id).aggregate(
+                last=Max('pub_date'),
+            )['last'],
+        )
+    stats.update(
+        top_authors=_top_authors(GroupAuthorStats.objects.all(), group_id),
+    )
+
+
+def _count(queryset, field: str) -> Coalesce:
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def reconcile() -> None:
+    UserStats.objects.bulk_create(
+        (
+            UserStats(user_id=user_id)
+            for user_id in User.objects.filter(
+                stats__isnull=True,
+            ).values_list('pk', flat=True)
+        ),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    UserStats.objects.update(
+        posts_count=_count(Post.objects.all(), 'author'),
+        followers_count=_count(Follow.objects.all(), 'author'),
+        following_count=_count(Follow.objects.all(), 'user'),
+    )
+    Post.objects.update(
+        comments_count=_count(Comment.objects.all(), 'post'),
+    )
+
+
+def reconcile_groups() -> None:
+    GroupStats.objects.bulk_create(
+        (
+            GroupStats(group_id=group_id)
+            for group_id in Group.objects.filter(
+                stats__isnull=True,
+            ).values_list('pk', flat=True)
+        ),
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    GroupAuthorStats.objects.all().delete()
+    GroupAuthorStats.objects.bulk_create(
+        (
+            GroupAuthorStats(
+                group_id=row['group'],
+                author_id=row['author'],
+                posts_count=row['total'],
+            )
+            for row in Post.objects.filter(group__isnull=False)
+            .order_by()
+            .values('group', 'author')
+            .annotate(total=Count('pk'))
+            .iterator()
+        ),
+        batch_size=1000,
+    )
+    GroupStats.objects.update(
+        posts_count=_count(Post.objects.all(), 'group'),
+        last_activity=Subquery(
+            Post.objects.filter(group=OuterRef('pk'))
+            .order_by('-pub_date')
+            .values('pub_date')[:1],
+        ),
+    )
+    for group_id in GroupStats.objects.values_list('pk', flat=True):
+        GroupStats.objects.filter(pk=group_id).update(
+            top_authors=_top_authors(GroupAuthorStats.objects.all(), group_id),
+        )
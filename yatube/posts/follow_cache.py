@@ -0,0 +1,115 @@
+"""
+Кэш подписок пользователя в памяти процесса.
+
+Множество id авторов, на которых подписан пользователь, загружается
+одним запросом и хранится в LRU ограниченного размера. Актуальность
+проверяется по номеру поколения в общем кэше, поэтому подписка в одном
+процессе сбрасывает множество и во всех остальных.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import FrozenSet, NamedTuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from core.cache import bump_generation, get_generation
+from posts.models import Follow
+
+User = get_user_model()
+
+
+class Entry(NamedTuple):
+    # date_joined отличает пользователя от прежнего владельца того же pk,
+    # например после отката транзакции в тестах.
+    joined: datetime
+    version: int
+    authors: FrozenSet[int]
+
+
+def follows_scope(user_id: int) -> str:
+    return f'follows:{user_id}'
+
+
+class FollowCache:
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.entries: 'OrderedDict[int, Entry]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+    def _store(self, user_id: int, entry: Entry) -> None:
+        with self.lock:
+            self.entries[user_id] = entry
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def authors(self, user: User) -> FrozenSet[int]:
+        version = get_generation(follows_scope(user.pk))
+        with self.lock:
+            entry = self.entries.get(user.pk)
+            if (
+                entry is not None
+                and entry.version == version
+                and entry.joined == user.date_joined
+            ):
+                self.entries.move_to_end(user.pk)
+                return entry.authors
+        # Множество запоминается под текущим поколением, поэтому читается
+        # с основной базы: отставшая реплика закрепила бы старые подписки.
+        authors = frozenset(
+            Follow.objects.using(DEFAULT_DB_ALIAS)
+            .filter(user_id=user.pk)
+            .values_list(
+                'author_id',
+                flat=True,
+            ),
+        )
+        self._store(user.pk, Entry(user.date_joined, version, authors))
+        return authors
+
+    def is_following(self, user: User, author_id: int) -> bool:
+        return author_id in self.authors(user)
+
+    def changed(self, user_id: int, author_id: int, following: bool) -> None:
+        """
+        Сбрасывает множество сразу и ещё раз после коммита: между ними
+        другой процесс мог успеть загрузить данные без этой записи.
+        После коммита множество обновляется на месте, без запроса к БД.
+        """
+        scope = follows_scope(user_id)
+        version = get_generation(scope)
+        with self.lock:
+            entry = self.entries.pop(user_id, None)
+        bump_generation(scope)
+        if entry is not None and entry.version != version:
+            entry = None
+
+        def apply() -> None:
+            # bump_generation уже увеличил номер ещё раз после коммита.
+            if entry is None:
+                return
+            authors = (
+                entry.authors | {author_id}
+                if following
+                else entry.authors - {author_id}
+            )
+            self._store(
+                user_id,
+                Entry(entry.joined, get_generation(scope), authors),
+            )
+
+        transaction.on_commit(apply)
+
+
+follow_cache = FollowCache(settings.FOLLOW_CACHE_SIZE)
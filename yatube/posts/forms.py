@@ -19,6 +19,15 @@ class PostForm(forms.ModelForm):
             'text': 'Добавьте текст для новой записи',
         }
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        upload_error = getattr(self.files.get('image'), 'upload_error', None)
+        if upload_error:
+            self.fields['image'].error_messages = {
+                **self.fields['image'].error_messages,
+                'invalid_image': upload_error,
+            }
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рекомендации авторов для подписки '
+        '(запускается периодически, например из cron)'
+    )
+
+    def handle(self, *args, **options):
+        created = rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f'Сохранено рекомендаций: {created}'),
+        )
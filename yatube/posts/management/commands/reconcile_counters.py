@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import trending
+from posts.counters import reconcile, reconcile_groups
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счётчики постов, комментариев, подписок и групп '
+        'и рейтинг популярности'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            reconcile()
+            reconcile_groups()
+            trending.rebuild()
+        self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны'))
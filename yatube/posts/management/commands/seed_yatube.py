@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from posts.seeding import seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу пользователями, группами, постами, комментариями '
+        'и подписками для стендов и нагрузочных замеров'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--comments', type=int, default=2000000)
+        parser.add_argument('--follows', type=int, default=200000)
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Зерно генератора: одинаковые параметры дают те же данные',
+        )
+        parser.add_argument(
+            '--prefix',
+            default='seed',
+            help='Префикс имён пользователей и слагов групп',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Число параллельных процессов (на SQLite всегда 1)',
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] > 1 and connection.vendor == 'sqlite':
+            self.stderr.write(
+                'SQLite не поддерживает параллельную запись, '
+                'используется один процесс',
+            )
+        started = time.perf_counter()
+        last = [started]
+
+        def progress(label, rows):
+            now = time.perf_counter()
+            self.stdout.write(
+                f'{label:<9} {rows:>10} за {now - last[0]:.1f} с',
+            )
+            last[0] = now
+
+        seed(
+            users=options['users'],
+            groups=options['groups'],
+            posts=options['posts'],
+            comments=options['comments'],
+            follows=options['follows'],
+            seed=options['seed'],
+            prefix=options['prefix'],
+            batch_size=options['batch_size'],
+            workers=options['workers'],
+            progress=progress,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Данные созданы за {time.perf_counter() - started:.1f} с',
+            )
+        )
@@ -13,6 +13,8 @@ class Migration(migrations.Migration):
         migrations.AlterField(
             model_name='post',
             name='image',
-            field=models.ImageField(blank=True, upload_to='posts/', verbose_name='картинка'),
+            field=models.ImageField(
+                blank=True, upload_to='posts/', verbose_name='картинка'
+            ),
         ),
     ]
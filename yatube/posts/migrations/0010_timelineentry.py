@@ -0,0 +1,96 @@
+# Generated by Django 2.2.16 on 2026-10-18 01:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def fill_timelines(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    Post = apps.get_model('posts', 'Post')
+    TimelineEntry = apps.get_model('posts', 'TimelineEntry')
+    quote = schema_editor.connection.ops.quote_name
+    entries, follows, posts = (
+        quote(model._meta.db_table) for model in (TimelineEntry, Follow, Post)
+    )
+    readers = list(
+        Follow.objects.order_by('user_id')
+        .values_list('user_id', flat=True)
+        .distinct()
+    )
+    with schema_editor.connection.cursor() as cursor:
+        for start in range(0, len(readers), BATCH_SIZE):
+            batch = readers[start : start + BATCH_SIZE]
+            cursor.execute(
+                f'INSERT INTO {entries} (user_id, post_id, pub_date) '
+                f'SELECT f.user_id, p.id, p.pub_date FROM {follows} f '
+                f'JOIN {posts} p ON p.author_id = f.author_id '
+                'WHERE f.user_id BETWEEN %s AND %s '
+                f'AND f.author_id NOT IN (SELECT author_id FROM {follows} '
+                'GROUP BY author_id HAVING COUNT(*) > %s)',
+                [batch[0], batch[-1], settings.TIMELINE_FANOUT_LIMIT],
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0009_auto_20230327_0124'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimelineEntry',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'pub_date',
+                    models.DateTimeField(verbose_name='дата публикации'),
+                ),
+                (
+                    'post',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='timeline_entries',
+                        to='posts.Post',
+                        verbose_name='пост',
+                    ),
+                ),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='timeline',
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name='читатель',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'запись ленты',
+                'verbose_name_plural': 'записи ленты',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='timelineentry',
+            index=models.Index(
+                fields=['user', '-pub_date'], name='timeline_user_date_idx'
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name='timelineentry',
+            unique_together={('user', 'post')},
+        ),
+        migrations.RunPython(fill_timelines, migrations.RunPython.noop),
+    ]
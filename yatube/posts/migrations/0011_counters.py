@@ -0,0 +1,101 @@
+# Generated by Django 2.2.16 on 2026-10-18 01:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count(queryset, field):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def fill_counters(apps, schema_editor):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    Follow = apps.get_model('posts', 'Follow')
+    UserStats = apps.get_model('posts', 'UserStats')
+    UserStats.objects.bulk_create(
+        (
+            UserStats(user_id=user_id)
+            for user_id in User.objects.values_list('pk', flat=True).iterator()
+        ),
+        batch_size=1000,
+    )
+    UserStats.objects.update(
+        posts_count=count(Post.objects.all(), 'author'),
+        followers_count=count(Follow.objects.all(), 'author'),
+        following_count=count(Follow.objects.all(), 'user'),
+    )
+    Post.objects.update(comments_count=count(Comment.objects.all(), 'post'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0010_timelineentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                (
+                    'user',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name='stats',
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name='пользователь',
+                    ),
+                ),
+                (
+                    'posts_count',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='количество постов'
+                    ),
+                ),
+                (
+                    'followers_count',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='количество подписчиков'
+                    ),
+                ),
+                (
+                    'following_count',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='количество подписок'
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'статистика пользователя',
+                'verbose_name_plural': 'статистика пользователей',
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                verbose_name='количество комментариев',
+            ),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
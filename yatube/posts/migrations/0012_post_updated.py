@@ -0,0 +1,24 @@
+# Generated by Django 2.2.16 on 2026-10-18 01:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated',
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                verbose_name='дата изменения',
+            ),
+            preserve_default=False,
+        ),
+    ]
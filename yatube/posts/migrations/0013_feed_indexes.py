@@ -0,0 +1,80 @@
+# Generated by Django 2.2.16 on 2026-10-18 01:27
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Min, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count(queryset, field):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')})
+            .order_by()
+            .values(field)
+            .annotate(total=Count('pk'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def remove_duplicate_follows(apps, schema_editor):
+    Follow = apps.get_model('posts', 'Follow')
+    UserStats = apps.get_model('posts', 'UserStats')
+    duplicates = (
+        Follow.objects.values('user', 'author')
+        .annotate(keep=Min('pk'), total=Count('pk'))
+        .filter(total__gt=1)
+    )
+    for row in duplicates.iterator():
+        Follow.objects.filter(
+            user=row['user'],
+            author=row['author'],
+        ).exclude(pk=row['keep']).delete()
+    UserStats.objects.update(
+        followers_count=count(Follow.objects.all(), 'author'),
+        following_count=count(Follow.objects.all(), 'user'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_post_updated'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_follows,
+            migrations.RunPython.noop,
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(
+                fields=['post', '-created'], name='comment_post_created_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-pub_date'], name='post_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(
+                fields=['author', '-pub_date'], name='post_author_date_idx'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(
+                fields=['group', '-pub_date'], name='post_group_date_idx'
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='follow',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'author'), name='unique_follow'
+            ),
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 2.2.16 on 2026-10-18 01:29
+
+import re
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+TERM_PATTERN = re.compile(r'\w+')
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 64
+BATCH_SIZE = 1000
+
+
+def tokenize(text):
+    return [
+        term[:MAX_TERM_LENGTH]
+        for term in TERM_PATTERN.findall(text.lower())
+        if len(term) >= MIN_TERM_LENGTH
+    ]
+
+
+def fill_search_index(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    SearchTerm = apps.get_model('posts', 'SearchTerm')
+    last_pk = 0
+    while True:
+        posts = list(
+            Post.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', 'text')[:BATCH_SIZE],
+        )
+        if not posts:
+            break
+        SearchTerm.objects.bulk_create(
+            (
+                SearchTerm(post_id=post_id, term=term, weight=weight)
+                for post_id, text in posts
+                for term, weight in Counter(tokenize(text)).items()
+            ),
+        )
+        last_pk = posts[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'term',
+                    models.CharField(max_length=64, verbose_name='слово'),
+                ),
+                (
+                    'weight',
+                    models.PositiveIntegerField(
+                        default=1, verbose_name='число вхождений'
+                    ),
+                ),
+                (
+                    'post',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='search_terms',
+                        to='posts.Post',
+                        verbose_name='пост',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'слово поискового индекса',
+                'verbose_name_plural': 'поисковый индекс',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchterm',
+            constraint=models.UniqueConstraint(
+                fields=('term', 'post'), name='unique_search_term'
+            ),
+        ),
+        migrations.RunPython(fill_search_index, migrations.RunPython.noop),
+    ]
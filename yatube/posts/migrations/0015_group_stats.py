@@ -0,0 +1,171 @@
+# Generated by Django 2.2.16 on 2026-10-18 01:43
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    GroupAuthorStats = apps.get_model('posts', 'GroupAuthorStats')
+    GroupStats.objects.bulk_create(
+        GroupStats(group_id=group_id)
+        for group_id in Group.objects.values_list('pk', flat=True).iterator()
+    )
+    GroupAuthorStats.objects.bulk_create(
+        GroupAuthorStats(
+            group_id=row['group'],
+            author_id=row['author'],
+            posts_count=row['total'],
+        )
+        for row in Post.objects.filter(group__isnull=False)
+        .order_by()
+        .values('group', 'author')
+        .annotate(total=Count('pk'))
+        .iterator()
+    )
+    GroupStats.objects.update(
+        posts_count=Coalesce(
+            Subquery(
+                Post.objects.filter(group=OuterRef('pk'))
+                .order_by()
+                .values('group')
+                .annotate(total=Count('pk'))
+                .values('total'),
+                output_field=IntegerField(),
+            ),
+            0,
+        ),
+        last_activity=Subquery(
+            Post.objects.filter(group=OuterRef('pk'))
+            .order_by('-pub_date')
+            .values('pub_date')[:1],
+        ),
+    )
+    top_authors = {}
+    rows = GroupAuthorStats.objects.order_by(
+        'group_id',
+        '-posts_count',
+        'author_id',
+    ).values_list('group_id', 'author__username')
+    for group_id, username in rows.iterator():
+        names = top_authors.setdefault(group_id, [])
+        if len(names) < settings.GROUP_TOP_AUTHORS:
+            names.append(username)
+    for group_id, names in top_authors.items():
+        GroupStats.objects.filter(pk=group_id).update(
+            top_authors=','.join(names),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0014_searchterm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                (
+                    'group',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name='stats',
+                        serialize=False,
+                        to='posts.Group',
+                        verbose_name='группа',
+                    ),
+                ),
+                (
+                    'posts_count',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='количество постов'
+                    ),
+                ),
+                (
+                    'last_activity',
+                    models.DateTimeField(
+                        blank=True,
+                        null=True,
+                        verbose_name='последняя публикация',
+                    ),
+                ),
+                (
+                    'top_authors',
+                    models.CharField(
+                        blank=True,
+                        help_text='Имена пользователей через запятую',
+                        max_length=500,
+                        verbose_name='самые активные авторы',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'статистика группы',
+                'verbose_name_plural': 'статистика групп',
+            },
+        ),
+        migrations.CreateModel(
+            name='GroupAuthorStats',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'posts_count',
+                    models.PositiveIntegerField(
+                        default=0, verbose_name='количество постов'
+                    ),
+                ),
+                (
+                    'author',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='group_stats',
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name='автор',
+                    ),
+                ),
+                (
+                    'group',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='author_stats',
+                        to='posts.Group',
+                        verbose_name='группа',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'статистика автора в группе',
+                'verbose_name_plural': 'статистика авторов в группах',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='groupauthorstats',
+            index=models.Index(
+                fields=['group', '-posts_count'], name='group_author_count_idx'
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='groupauthorstats',
+            constraint=models.UniqueConstraint(
+                fields=('group', 'author'), name='unique_group_author'
+            ),
+        ),
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
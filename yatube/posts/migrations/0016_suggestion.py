@@ -0,0 +1,78 @@
+# Generated by Django 2.2.16 on 2026-10-18 01:48
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0015_group_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Suggestion',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name='ID',
+                    ),
+                ),
+                (
+                    'score',
+                    models.PositiveIntegerField(
+                        verbose_name='вес рекомендации'
+                    ),
+                ),
+                (
+                    'mutual',
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text='Сколько авторов из подписок читателя читают этого автора',
+                        verbose_name='общих подписок',
+                    ),
+                ),
+                (
+                    'author',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='+',
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name='рекомендуемый автор',
+                    ),
+                ),
+                (
+                    'user',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='suggestions',
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name='читатель',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'рекомендация автора',
+                'verbose_name_plural': 'рекомендации авторов',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='suggestion',
+            index=models.Index(
+                fields=['user', '-score'], name='suggestion_user_score_idx'
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='suggestion',
+            constraint=models.UniqueConstraint(
+                fields=('user', 'author'), name='unique_suggestion'
+            ),
+        ),
+    ]
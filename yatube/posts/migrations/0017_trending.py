@@ -0,0 +1,81 @@
+# Generated by Django 2.2.16 on 2026-10-18 01:50
+
+import math
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import migrations, models
+
+EPOCH = datetime(2022, 1, 1, tzinfo=timezone.utc)
+POST_WEIGHT = 1.0
+COMMENT_WEIGHT = 1.0
+BATCH_SIZE = 1000
+
+
+def event_score(when, weight):
+    tau = settings.TRENDING_HALF_LIFE * 3600 / math.log(2)
+    return math.log(weight) + (when - EPOCH).total_seconds() / tau
+
+
+def combine(scores):
+    top = max(scores)
+    return top + math.log(sum(math.exp(score - top) for score in scores))
+
+
+def fill_trending(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Comment = apps.get_model('posts', 'Comment')
+    last_pk = 0
+    while True:
+        scores = {
+            pk: [event_score(pub_date, POST_WEIGHT)]
+            for pk, pub_date in Post.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', 'pub_date')[:BATCH_SIZE]
+        }
+        if not scores:
+            break
+        for post_id, created in (
+            Comment.objects.filter(
+                post_id__in=list(scores),
+            )
+            .values_list('post_id', 'created')
+            .iterator()
+        ):
+            scores[post_id].append(event_score(created, COMMENT_WEIGHT))
+        Post.objects.bulk_update(
+            [
+                Post(pk=pk, trending_score=combine(events))
+                for pk, events in scores.items()
+            ],
+            ['trending_score'],
+            batch_size=500,
+        )
+        last_pk = max(scores)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_suggestion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='trending_score',
+            field=models.FloatField(
+                editable=False,
+                help_text='Логарифм суммы весов событий с затуханием по времени',
+                null=True,
+                verbose_name='рейтинг популярности',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(
+                fields=['-trending_score'], name='post_trending_idx'
+            ),
+        ),
+        migrations.RunPython(fill_trending, migrations.RunPython.noop),
+    ]
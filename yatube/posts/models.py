@@ -1,3 +1,5 @@
+from typing import List
+
 from django.contrib.auth import get_user_model
 from django.db import models
 
@@ -27,6 +29,7 @@ class Post(models.Model):
         'дата публикации',
         auto_now_add=True,
     )
+    updated = models.DateTimeField('дата изменения', auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -41,12 +44,38 @@ class Post(models.Model):
         help_text='Группа, к которой будет относиться пост',
     )
     image = models.ImageField('картинка', upload_to='posts/', blank=True)
+    comments_count = models.PositiveIntegerField(
+        'количество комментариев',
+        default=0,
+        editable=False,
+    )
+    trending_score = models.FloatField(
+        'рейтинг популярности',
+        null=True,
+        editable=False,
+        help_text='Логарифм суммы весов событий с затуханием по времени',
+    )
 
     class Meta:
         ordering = ('-pub_date',)
         default_related_name = 'posts'
         verbose_name = 'пост'
         verbose_name_plural = 'посты'
+        indexes = (
+            models.Index(fields=('-pub_date',), name='post_date_idx'),
+            models.Index(
+                fields=('-trending_score',),
+                name='post_trending_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_date_idx',
+            ),
+            models.Index(
+                fields=('group', '-pub_date'),
+                name='post_group_date_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return truncatechars(self.text)
@@ -77,6 +106,12 @@ class Comment(models.Model):
         default_related_name = 'comments'
         verbose_name = 'комментарий'
         verbose_name_plural = 'комментарии'
+        indexes = (
+            models.Index(
+                fields=('post', '-created'),
+                name='comment_post_created_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return truncatechars(self.text)
@@ -96,5 +131,201 @@ class Follow(models.Model):
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_follow',
+            ),
+        )
+
     def __str__(self) -> str:
         return f'Подписчик: {self.user}, автор: {self.author}'
+
+
+class UserStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        verbose_name='пользователь',
+        related_name='stats',
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    posts_count = models.PositiveIntegerField('количество постов', default=0)
+    followers_count = models.PositiveIntegerField(
+        'количество подписчиков',
+        default=0,
+    )
+    following_count = models.PositiveIntegerField(
+        'количество подписок',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'статистика пользователя'
+        verbose_name_plural = 'статистика пользователей'
+
+    def __str__(self) -> str:
+        return f'Статистика {self.user}'
+
+
+class GroupStats(models.Model):
+    group = models.OneToOneField(
+        Group,
+        verbose_name='группа',
+        related_name='stats',
+        on_delete=models.CASCADE,
+        primary_key=True,
+    )
+    posts_count = models.PositiveIntegerField('количество постов', default=0)
+    last_activity = models.DateTimeField(
+        'последняя публикация',
+        null=True,
+        blank=True,
+    )
+    top_authors = models.CharField(
+        'самые активные авторы',
+        max_length=500,
+        blank=True,
+        help_text='Имена пользователей через запятую',
+    )
+
+    class Meta:
+        verbose_name = 'статистика группы'
+        verbose_name_plural = 'статистика групп'
+
+    def __str__(self) -> str:
+        return f'Статистика {self.group}'
+
+    @property
+    def top_authors_list(self) -> List[str]:
+        return self.top_authors.split(',') if self.top_authors else []
+
+
+class GroupAuthorStats(models.Model):
+    group = models.ForeignKey(
+        Group,
+        verbose_name='группа',
+        related_name='author_stats',
+        on_delete=models.CASCADE,
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name='автор',
+        related_name='group_stats',
+        on_delete=models.CASCADE,
+    )
+    posts_count = models.PositiveIntegerField('количество постов', default=0)
+
+    class Meta:
+        verbose_name = 'статистика автора в группе'
+        verbose_name_plural = 'статистика авторов в группах'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('group', 'author'),
+                name='unique_group_author',
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('group', '-posts_count'),
+                name='group_author_count_idx',
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.author} в {self.group}: {self.posts_count}'
+
+
+class Suggestion(models.Model):
+    user = models.ForeignKey(
+        User,
+        verbose_name='читатель',
+        related_name='suggestions',
+        on_delete=models.CASCADE,
+    )
+    author = models.ForeignKey(
+        User,
+        verbose_name='рекомендуемый автор',
+        related_name='+',
+        on_delete=models.CASCADE,
+    )
+    score = models.PositiveIntegerField('вес рекомендации')
+    mutual = models.PositiveIntegerField(
+        'общих подписок',
+        default=0,
+        help_text='Сколько авторов из подписок читателя читают этого автора',
+    )
+
+    class Meta:
+        verbose_name = 'рекомендация автора'
+        verbose_name_plural = 'рекомендации авторов'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_suggestion',
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-score'),
+                name='suggestion_user_score_idx',
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.user} → {self.author}: {self.score}'
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        verbose_name='читатель',
+        related_name='timeline',
+        on_delete=models.CASCADE,
+    )
+    post = models.ForeignKey(
+        Post,
+        verbose_name='пост',
+        related_name='timeline_entries',
+        on_delete=models.CASCADE,
+    )
+    pub_date = models.DateTimeField('дата публикации')
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'записи ленты'
+        unique_together = ('user', 'post')
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date'),
+                name='timeline_user_date_idx',
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f'Лента {self.user}: {self.post}'
+
+
+class SearchTerm(models.Model):
+    term = models.CharField('слово', max_length=64)
+    post = models.ForeignKey(
+        Post,
+        verbose_name='пост',
+        related_name='search_terms',
+        on_delete=models.CASCADE,
+    )
+    weight = models.PositiveIntegerField('число вхождений', default=1)
+
+    class Meta:
+        verbose_name = 'слово поискового индекса'
+        verbose_name_plural = 'поисковый индекс'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('term', 'post'),
+                name='unique_search_term',
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.term}: {self.post}'
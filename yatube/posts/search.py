@@ -0,0 +1,120 @@
+"""
+Полнотекстовый поиск по постам на инвертированном индексе.
+
+Индекс (слово, пост, число вхождений) хранится в таблице SearchTerm и
+обновляется при сохранении поста. Поиск находит посты, содержащие все
+слова запроса, и ранжирует их по TF-IDF с целочисленными весами, чтобы
+результаты можно было листать курсором по (score, id).
+"""
+
+import math
+import re
+from collections import Counter
+from typing import List
+
+from django.core.cache import cache
+from django.db.models import Case, Count, F, IntegerField, Sum, Value, When
+from django.db.models.query import QuerySet
+
+from core.cache import generation_prefix
+from posts import versions
+from posts.models import Post, SearchTerm
+
+TERM_PATTERN = re.compile(r'\w+')
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 8
+IDF_SCALE = 1000
+REBUILD_BATCH_SIZE = 1000
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        term[:MAX_TERM_LENGTH]
+        for term in TERM_PATTERN.findall(text.lower())
+        if len(term) >= MIN_TERM_LENGTH
+    ]
+
+
+def index_post(post: Post) -> None:
+    SearchTerm.objects.filter(post_id=post.pk).delete()
+    SearchTerm.objects.bulk_create(
+        SearchTerm(post_id=post.pk, term=term, weight=weight)
+        for term, weight in Counter(tokenize(post.text)).items()
+    )
+
+
+def rebuild() -> None:
+    SearchTerm.objects.all().delete()
+    last_pk = 0
+    while True:
+        posts = list(
+            Post.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', 'text')[:REBUILD_BATCH_SIZE],
+        )
+        if not posts:
+            return
+        SearchTerm.objects.bulk_create(
+            (
+                SearchTerm(post_id=post_id, term=term, weight=weight)
+                for post_id, text in posts
+                for term, weight in Counter(tokenize(text)).items()
+            ),
+        )
+        last_pk = posts[-1][0]
+
+
+def document_count() -> int:
+    """
+    Число постов для IDF. Максимальный pk после удалений его завышает,
+    а COUNT(*) на каждый запрос дорог, поэтому число кэшируется до
+    следующего создания или удаления поста.
+    """
+    key = generation_prefix('search_documents', (versions.COUNTS_SCOPE,))
+    total = cache.get(key)
+    if total is None:
+        total = Post.objects.count()
+        cache.set(key, total)
+    return total
+
+
+def no_results() -> QuerySet:
+    return Post.objects.none().annotate(
+        score=Value(0, output_field=IntegerField()),
+    )
+
+
+def search_posts(query: str) -> QuerySet:
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return no_results()
+    total = document_count() or 1
+    frequencies = dict(
+        SearchTerm.objects.filter(term__in=terms)
+        .values_list('term')
+        .annotate(Count('pk')),
+    )
+    if len(frequencies) < len(terms):
+        return no_results()
+    return (
+        Post.objects.select_related('author', 'group')
+        .filter(search_terms__term__in=terms)
+        .annotate(
+            matched=Count('search_terms'),
+            score=Sum(
+                Case(
+                    *(
+                        When(
+                            search_terms__term=term,
+                            then=F('search_terms__weight')
+                            * int(IDF_SCALE * math.log(1 + total / count)),
+                        )
+                        for term, count in frequencies.items()
+                    ),
+                    output_field=IntegerField(),
+                ),
+            ),
+        )
+        .filter(matched=len(terms))
+    )
@@ -0,0 +1,357 @@
+"""
+Генерация тестовых данных для стендов и нагрузочных замеров.
+
+Объекты создаются пачками через bulk_create (на PostgreSQL — через
+COPY), поэтому сигналы не срабатывают: счётчики, ленты подписок и
+поисковый индекс пересчитываются после вставки одним проходом.
+
+Каждая пачка получает собственный генератор случайных чисел, зависящий
+только от seed, типа объектов и номера первой строки, поэтому при
+одинаковых параметрах данные совпадают независимо от числа процессов.
+Даты тоже берутся из генератора, от фиксированной BASE_DATE, а не от
+текущего времени. Пачки вставляются в произвольном порядке, поэтому
+созданные объекты нумеруются не по pk, а по имени или дате публикации.
+"""
+
+import io
+import multiprocessing
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, connections
+from django.db.models import AutoField
+
+from core.cache import bump_generation
+from posts import (
+    counters,
+    recommendations,
+    search,
+    timeline,
+    trending,
+    versions,
+)
+from posts.follow_cache import follows_scope
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+DEFAULT_PASSWORD = 'yatube-seed'
+BASE_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+POST_INTERVAL = 10 * 60
+COMMENT_DELAY = 7 * 24 * 60 * 60
+WORDS = (
+    'кот',
+    'собака',
+    'утро',
+    'город',
+    'море',
+    'книга',
+    'дорога',
+    'лес',
+    'друг',
+    'музыка',
+    'кофе',
+    'дождь',
+    'солнце',
+    'работа',
+    'праздник',
+    'история',
+    'фото',
+    'вечер',
+    'зима',
+    'лето',
+    'новости',
+    'проект',
+)
+COPY_ESCAPES = str.maketrans(
+    {
+        '\\': '\\\\',
+        '\t': '\\t',
+        '\n': '\\n',
+        '\r': '\\r',
+    }
+)
+
+_context: Dict[str, Any] = {}
+
+
+def sentence(rnd: random.Random, words: int) -> str:
+    return ' '.join(rnd.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def ids(queryset, ordering: str) -> List[int]:
+    return list(queryset.order_by(ordering).values_list('pk', flat=True))
+
+
+@contextmanager
+def explicit_dates() -> Iterator[None]:
+    """Отключает auto_now, чтобы вставлялись даты из генератора."""
+    fields = [
+        Post._meta.get_field('pub_date'),
+        Post._meta.get_field('updated'),
+        Comment._meta.get_field('created'),
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now = auto_now
+            field.auto_now_add = auto_now_add
+
+
+def create(model, objects: Iterable, batch_size: int) -> None:
+    objects = list(objects)
+    limit = connection.ops.bulk_batch_size(
+        model._meta.concrete_fields,
+        objects,
+    )
+    model.objects.bulk_create(
+        objects,
+        batch_size=max(min(batch_size, limit), 1),
+    )
+
+
+def copy_value(value: Any) -> str:
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value).translate(COPY_ESCAPES)
+
+
+def copy(model, objects: Iterable) -> None:
+    """Вставляет объекты одной командой COPY ... FROM STDIN."""
+    fields = [
+        field
+        for field in model._meta.concrete_fields
+        if not isinstance(field, AutoField)
+    ]
+    buffer = io.StringIO()
+    for obj in objects:
+        buffer.write(
+            '\t'.join(
+                copy_value(
+                    field.get_db_prep_save(
+                        field.pre_save(obj, add=True),
+                        connection,
+                    )
+                )
+                for field in fields
+            )
+        )
+        buffer.write('\n')
+    buffer.seek(0)
+    quote = connection.ops.quote_name
+    sql = 'COPY {} ({}) FROM STDIN'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+    )
+    with connection.cursor() as cursor:
+        cursor.copy_expert(sql, buffer)
+
+
+def write(model, objects: Iterable, batch_size: int) -> None:
+    if connection.vendor == 'postgresql':
+        copy(model, objects)
+    else:
+        create(model, objects, batch_size)
+
+
+def build_users(rnd: random.Random, start: int, count: int) -> Iterable:
+    for number in range(start, start + count):
+        yield User(
+            username=f'{_context["prefix"]}_user_{number}',
+            password=_context['password'],
+        )
+
+
+def build_groups(rnd: random.Random, start: int, count: int) -> Iterable:
+    for number in range(start, start + count):
+        yield Group(
+            title=f'Группа {number}',
+            slug=f'{_context["prefix"]}-group-{number}',
+            description=sentence(rnd, 12),
+        )
+
+
+def build_posts(rnd: random.Random, start: int, count: int) -> Iterable:
+    user_ids = _context['user_ids']
+    group_ids = _context['group_ids'] + [None]
+    for number in range(start, start + count):
+        # Даты постов не повторяются и растут вместе с номером.
+        pub_date = BASE_DATE + timedelta(
+            seconds=number * POST_INTERVAL + rnd.randrange(POST_INTERVAL),
+        )
+        yield Post(
+            author_id=rnd.choice(user_ids),
+            group_id=rnd.choice(group_ids),
+            text=sentence(rnd, rnd.randint(5, 40)),
+            pub_date=pub_date,
+            updated=pub_date,
+        )
+
+
+def build_comments(rnd: random.Random, start: int, count: int) -> Iterable:
+    user_ids = _context['user_ids']
+    posts = _context['posts']
+    for _ in range(count):
+        post_id, pub_date = rnd.choice(posts)
+        delay = timedelta(seconds=rnd.randrange(COMMENT_DELAY))
+        yield Comment(
+            post_id=post_id,
+            author_id=rnd.choice(user_ids),
+            text=sentence(rnd, rnd.randint(3, 15)),
+            created=pub_date + delay,
+        )
+
+
+def follows_of(index: int, users: int, follows: int) -> int:
+    """Сколько авторов читает пользователь с данным порядковым номером."""
+    per_user, extra = divmod(follows, users)
+    return min(per_user + (index < extra), users - 1)
+
+
+def build_follows(rnd: random.Random, start: int, count: int) -> Iterable:
+    user_ids = _context['user_ids']
+    for index in range(start, start + count):
+        wanted = follows_of(index, len(user_ids), _context['follows'])
+        authors = rnd.sample(range(len(user_ids)), wanted + 1)
+        authors = [author for author in authors if author != index]
+        for author in authors[:wanted]:
+            yield Follow(user_id=user_ids[index], author_id=user_ids[author])
+
+
+BUILDERS = {
+    'users': (User, build_users),
+    'groups': (Group, build_groups),
+    'posts': (Post, build_posts),
+    'comments': (Comment, build_comments),
+    'follows': (Follow, build_follows),
+}
+
+
+def _init_worker(context: Dict[str, Any]) -> None:
+    _context.clear()
+    _context.update(context)
+
+
+def _run_batch(batch) -> int:
+    label, start, count = batch
+    model, build = BUILDERS[label]
+    rnd = random.Random(f'{_context["seed"]}:{label}:{start}')
+    write(model, build(rnd, start, count), _context['batch_size'])
+    return count
+
+
+def run_phase(
+    label: str,
+    total: int,
+    context: Dict[str, Any],
+    workers: int,
+) -> None:
+    size = context['batch_size']
+    batches = [
+        (label, start, min(size, total - start))
+        for start in range(0, total, size)
+    ]
+    if workers <= 1 or len(batches) <= 1:
+        _init_worker(context)
+        for batch in batches:
+            _run_batch(batch)
+        return
+    # Дочерние процессы не должны делить соединение родителя.
+    connections.close_all()
+    pool = multiprocessing.get_context('fork').Pool(
+        workers,
+        initializer=_init_worker,
+        initargs=(context,),
+    )
+    with pool:
+        for _ in pool.imap_unordered(_run_batch, batches):
+            pass
+
+
+def seed(
+    users: int = 100,
+    groups: int = 10,
+    posts: int = 1000,
+    comments: int = 2000,
+    follows: int = 500,
+    seed: int = 0,
+    prefix: str = 'seed',
+    batch_size: int = 1000,
+    workers: int = 1,
+    progress: Optional[Callable[[str, int], None]] = None,
+) -> Dict[str, int]:
+    if connection.vendor == 'sqlite':
+        # SQLite блокирует базу целиком, параллельная запись не ускорит.
+        workers = 1
+    context = {
+        'seed': seed,
+        'prefix': prefix,
+        'batch_size': batch_size,
+        'password': make_password(DEFAULT_PASSWORD),
+        'follows': follows,
+    }
+
+    follow_rows = sum(
+        follows_of(index, users, follows) for index in range(users)
+    )
+
+    def phase(label: str, total: int, rows: Optional[int] = None) -> None:
+        run_phase(label, total, context, workers)
+        if progress is not None:
+            progress(label, total if rows is None else rows)
+
+    with explicit_dates():
+        phase('users', users)
+        context['user_ids'] = ids(
+            User.objects.filter(username__startswith=f'{prefix}_user_'),
+            'username',
+        )
+        phase('groups', groups)
+        context['group_ids'] = ids(
+            Group.objects.filter(slug__startswith=f'{prefix}-group-'),
+            'slug',
+        )
+        phase('posts', posts)
+        context['posts'] = list(
+            Post.objects.filter(
+                author__username__startswith=f'{prefix}_user_',
+            )
+            .order_by('pub_date')
+            .values_list('pk', 'pub_date'),
+        )
+        phase('comments', comments)
+        phase('follows', users, follow_rows)
+
+    counters.reconcile()
+    counters.reconcile_groups()
+    timeline.rebuild()
+    search.rebuild()
+    trending.rebuild()
+    recommendations.rebuild()
+    bump_generation(
+        'posts',
+        versions.COUNTS_SCOPE,
+        *(versions.group_scope(pk) for pk in context['group_ids']),
+        *(versions.author_scope(pk) for pk in context['user_ids']),
+        *(follows_scope(pk) for pk in context['user_ids']),
+        *(timeline.timeline_scope(pk) for pk in context['user_ids']),
+    )
+    return {
+        'users': users,
+        'groups': groups,
+        'posts': posts,
+        'comments': comments,
+        'follows': follow_rows,
+    }
@@ -0,0 +1,221 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core import thumbnails, uploads
+from core.cache import bump_generation
+from posts import counters, search, timeline, trending, versions
+from posts.follow_cache import follow_cache
+from posts.models import Comment, Follow, Group, GroupStats, Post, UserStats
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def user_stats_create(sender, instance: User, created: bool, **kwargs) -> None:
+    if created and not kwargs.get('raw'):
+        UserStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance: Post, created: bool, **kwargs) -> None:
+    if created:
+        counters.bump_user(instance.author_id, posts_count=1)
+        timeline.fan_out(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance: Post, **kwargs) -> None:
+    counters.bump_user(instance.author_id, create=False, posts_count=-1)
+    timeline.remove_post(instance)
+
+
+@receiver(post_save, sender=Group)
+def group_stats_create(
+    sender,
+    instance: Group,
+    created: bool,
+    **kwargs,
+) -> None:
+    if created and not kwargs.get('raw'):
+        GroupStats.objects.get_or_create(group=instance)
+
+
+@receiver(post_save, sender=Post)
+def post_group_stats(
+    sender,
+    instance: Post,
+    created: bool,
+    **kwargs,
+) -> None:
+    if kwargs.get('raw'):
+        return
+    initial_group_id = None if created else instance._initial_group_id
+    if initial_group_id == instance.group_id:
+        return
+    if initial_group_id is not None:
+        counters.bump_group(initial_group_id, instance.author_id, -1)
+    if instance.group_id is not None:
+        counters.bump_group(
+            instance.group_id,
+            instance.author_id,
+            1,
+            activity=instance.pub_date,
+        )
+
+
+@receiver(post_delete, sender=Post)
+def post_group_stats_deleted(sender, instance: Post, **kwargs) -> None:
+    if instance.group_id is not None:
+        counters.bump_group(instance.group_id, instance.author_id, -1)
+
+
+@receiver(pre_save, sender=Post)
+def post_trending_score(sender, instance: Post, **kwargs) -> None:
+    # pub_date (auto_now_add) заполняется позже, в момент вставки.
+    if instance._state.adding and not kwargs.get('raw'):
+        instance.trending_score = trending.event_score(
+            timezone.now(),
+            trending.POST_WEIGHT,
+        )
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(
+    sender,
+    instance: Comment,
+    created: bool,
+    **kwargs,
+) -> None:
+    if created:
+        counters.bump_post(instance.post_id, 1)
+        trending.add_event(
+            instance.post_id,
+            instance.created,
+            trending.COMMENT_WEIGHT,
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance: Comment, **kwargs) -> None:
+    counters.bump_post(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance: Follow, created: bool, **kwargs) -> None:
+    if created:
+        counters.bump_user(instance.user_id, following_count=1)
+        counters.bump_user(instance.author_id, followers_count=1)
+        timeline.add_author(instance.user, instance.author)
+        follow_cache.changed(instance.user_id, instance.author_id, True)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance: Follow, **kwargs) -> None:
+    counters.bump_user(instance.user_id, create=False, following_count=-1)
+    counters.bump_user(instance.author_id, create=False, followers_count=-1)
+    timeline.remove_author(instance.user_id, instance.author_id)
+    timeline.resume_fan_out(instance.author_id)
+    follow_cache.changed(instance.user_id, instance.author_id, False)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def posts_changed(sender, **kwargs) -> None:
+    bump_generation('posts')
+
+
+@receiver(post_save, sender=Post)
+def post_thumbnails(sender, instance: Post, **kwargs) -> None:
+    if instance.image and not kwargs.get('raw'):
+        thumbnails.schedule(instance.image)
+
+
+@receiver(post_save, sender=Post)
+def post_search_index(sender, instance: Post, **kwargs) -> None:
+    if not kwargs.get('raw'):
+        search.index_post(instance)
+
+
+@receiver(post_init, sender=Post)
+def post_remember_group(sender, instance: Post, **kwargs) -> None:
+    instance._initial_group_id = instance.__dict__.get('group_id')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_versions(sender, instance: Post, **kwargs) -> None:
+    versions.touch_post(instance.pk, instance.author_id, instance.group_id)
+    initial_group_id = getattr(instance, '_initial_group_id', None)
+    if initial_group_id not in (None, instance.group_id):
+        bump_generation(versions.group_scope(initial_group_id))
+
+
+@receiver(post_save, sender=Post)
+def post_counts_changed(
+    sender,
+    instance: Post,
+    created: bool,
+    **kwargs,
+) -> None:
+    # Перенос в другую группу учтён в post_versions поколениями групп.
+    if created:
+        bump_generation(versions.COUNTS_SCOPE)
+
+
+@receiver(post_delete, sender=Post)
+def post_counts_deleted(sender, **kwargs) -> None:
+    bump_generation(versions.COUNTS_SCOPE)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_versions(sender, instance: Comment, **kwargs) -> None:
+    bump_generation(versions.post_scope(instance.post_id))
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def follow_versions(sender, instance: Follow, **kwargs) -> None:
+    bump_generation(versions.author_scope(instance.author_id))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_versions(sender, instance: Group, **kwargs) -> None:
+    bump_generation(
+        versions.group_scope(instance.pk),
+        versions.GROUPS_SCOPE,
+    )
+
+
+@receiver(thumbnails.thumbnails_ready)
+def thumbnail_versions(sender, name: str, **kwargs) -> None:
+    posts = Post.objects.filter(image=name).values_list(
+        'pk',
+        'author_id',
+        'group_id',
+    )
+    for post_id, author_id, group_id in posts:
+        versions.touch_post(post_id, author_id, group_id)
+    # Главная закэширована целиком и иначе показывала бы заглушку.
+    bump_generation('posts')
+
+
+@receiver(uploads.original_replaced)
+def post_image_replaced(sender, name: str, new_name: str, **kwargs) -> None:
+    Post.objects.filter(image=name).update(image=new_name)
+
+
+@receiver(post_save, sender=Post)
+def post_reset_group(sender, instance: Post, **kwargs) -> None:
+    # Подключается последним: обработчики выше сравнивают группу с прежней.
+    instance._initial_group_id = instance.group_id
@@ -0,0 +1,125 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from core.cache import state_cache
+from posts.comment_buffer import comment_buffer
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+@override_settings(
+    COMMENT_WRITE_BEHIND=True,
+    COMMENT_BUFFER_SIZE=1000,
+    COMMENT_FLUSH_INTERVAL=3600 * 1000,
+)
+class CommentBufferTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = mixer.blend(User, username='TestUser')
+        cls.reader = mixer.blend(User, username='Reader')
+
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+
+    def setUp(self):
+        cache.clear()
+        state_cache().clear()
+        self.post = Post.objects.create(author=self.user, text='Пост')
+        self.addCleanup(comment_buffer.flush)
+
+    def comment(self, text, post=None):
+        return self.authorized_client.post(
+            reverse(
+                'posts:add_comment',
+                args=((post or self.post).pk,),
+            ),
+            {'text': text},
+        )
+
+    def test_comments_written_in_one_batch(self):
+        """Комментарии записываются пачкой и обновляют счётчики поста."""
+        score = self.post.trending_score
+        for number in range(3):
+            self.comment(f'Комментарий {number}')
+        self.assertFalse(Comment.objects.exists())
+        with self.assertNumQueries(5):
+            self.assertEqual(comment_buffer.flush(), 3)
+        self.assertEqual(Comment.objects.filter(post=self.post).count(), 3)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 3)
+        self.assertGreater(self.post.trending_score, score)
+
+    def test_author_sees_pending_comment(self):
+        """Автор видит свой комментарий до записи, остальные — после."""
+        url = reverse('posts:post_detail', args=(self.post.pk,))
+        response = self.comment('Ещё в буфере')
+        self.assertRedirects(response, url)
+        self.assertContains(
+            self.authorized_client.get(url),
+            'Ещё в буфере',
+        )
+        self.assertNotContains(self.reader_client.get(url), 'Ещё в буфере')
+        comment_buffer.flush()
+        self.assertContains(
+            self.authorized_client.get(url),
+            'Ещё в буфере',
+            count=1,
+        )
+        self.assertContains(self.reader_client.get(url), 'Ещё в буфере')
+
+    def test_saved_comment_not_shown_twice(self):
+        """Записанный, но не убранный из кэша комментарий не дублируется."""
+        url = reverse('posts:post_detail', args=(self.post.pk,))
+        self.comment('Повтор')
+        self.comment('Повтор')
+        with mock.patch('posts.comment_buffer.forget'):
+            comment_buffer.flush()
+        self.comment('Повтор')
+        self.assertContains(
+            self.authorized_client.get(url),
+            'Повтор',
+            count=3,
+        )
+
+    def test_failed_batch_written_one_by_one(self):
+        """Если пачка не записалась, комментарии записываются по одному."""
+        other = Post.objects.create(author=self.user, text='Другой пост')
+        self.comment('Первый')
+        self.comment('Второй', other)
+        bulk_create = Comment.objects.bulk_create
+
+        def fail_on_first_post(comments):
+            if any(comment.post_id == self.post.pk for comment in comments):
+                raise DatabaseError
+            return bulk_create(comments)
+
+        with mock.patch.object(
+            Comment.objects,
+            'bulk_create',
+            side_effect=fail_on_first_post,
+        ):
+            self.assertEqual(comment_buffer.flush(), 1)
+        self.assertEqual(
+            list(Comment.objects.values_list('text', flat=True)),
+            ['Второй'],
+        )
+
+    def test_missing_post(self):
+        """Комментарий к несуществующему посту не попадает в буфер."""
+        response = self.authorized_client.post(
+            reverse('posts:add_comment', args=(self.post.pk + 100,)),
+            {'text': 'Никуда'},
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(len(comment_buffer), 0)
@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from core.routers import replica_reads
+from posts.follow_cache import FollowCache, follow_cache
+from posts.models import Follow
+
+User = get_user_model()
+
+
+class FollowCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = mixer.blend(User, username='TestUser')
+        cls.authors = mixer.cycle(3).blend(User)
+
+        cls.authorized_client = Client()
+
+        cls.authorized_client.force_login(cls.user)
+
+    def setUp(self):
+        cache.clear()
+        follow_cache.clear()
+
+    @override_settings(DATABASE_REPLICAS=['replica0'])
+    def test_set_is_read_from_primary(self):
+        """Подписки читаются с основной базы и при чтении с реплик."""
+        Follow.objects.create(user=self.user, author=self.authors[0])
+        token = replica_reads.set(True)
+        try:
+            authors = follow_cache.authors(self.user)
+        finally:
+            replica_reads.reset(token)
+        self.assertEqual(authors, {self.authors[0].pk})
+
+    def test_set_is_loaded_once(self):
+        """Подписки загружаются одним запросом и переиспользуются."""
+        Follow.objects.create(user=self.user, author=self.authors[0])
+        with self.assertNumQueries(1):
+            follow_cache.authors(self.user)
+        with self.assertNumQueries(0):
+            self.assertTrue(
+                follow_cache.is_following(self.user, self.authors[0].pk),
+            )
+            self.assertFalse(
+                follow_cache.is_following(self.user, self.authors[1].pk),
+            )
+
+    def test_follow_and_unfollow_reset_set(self):
+        """Подписка и отписка сразу видны в кэше."""
+        author = self.authors[0]
+        self.assertFalse(follow_cache.is_following(self.user, author.pk))
+        follow = Follow.objects.create(user=self.user, author=author)
+        self.assertTrue(follow_cache.is_following(self.user, author.pk))
+        follow.delete()
+        self.assertFalse(follow_cache.is_following(self.user, author.pk))
+
+    def test_reused_pk_is_reloaded(self):
+        """Новый пользователь с прежним pk не получает чужие подписки."""
+        Follow.objects.create(user=self.user, author=self.authors[0])
+        follow_cache.authors(self.user)
+        Follow.objects.filter(user=self.user).update(author=self.authors[1])
+        self.user.date_joined -= timedelta(days=1)
+        self.assertEqual(
+            follow_cache.authors(self.user),
+            {self.authors[1].pk},
+        )
+
+    def test_lru_is_bounded(self):
+        """LRU вытесняет давно не использованных пользователей."""
+        lru = FollowCache(maxsize=2)
+        lru.authors(self.authors[0])
+        lru.authors(self.authors[1])
+        lru.authors(self.authors[0])
+        lru.authors(self.authors[2])
+        self.assertEqual(len(lru), 2)
+        self.assertEqual(
+            list(lru.entries),
+            [self.authors[0].pk, self.authors[2].pk],
+        )
+
+    def test_noop_toggles_skip_follow_queries(self):
+        """Повторная подписка и лишняя отписка не обращаются к подпискам."""
+        author = self.authors[0]
+        follow_url = reverse('posts:profile_follow', args=(author.username,))
+        self.authorized_client.get(follow_url)
+        self.assertTrue(
+            Follow.objects.filter(user=self.user, author=author).exists(),
+        )
+        self.authorized_client.get(
+            reverse('posts:profile', args=(author.username,)),
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(follow_url)
+        self.assertFalse(
+            any('posts_follow' in query['sql'] for query in queries),
+        )
+
+        unfollow_url = reverse(
+            'posts:profile_unfollow',
+            args=(self.authors[1].username,),
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(unfollow_url)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(
+            any('posts_follow' in query['sql'] for query in queries),
+        )
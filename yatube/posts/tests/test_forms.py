@@ -1,12 +1,17 @@
 import shutil
+from unittest import mock
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from mixer.backend.django import mixer
+from PIL import Image
 
+from core.uploads import shrink_original
 from posts.models import Comment, Post
 from posts.tests.common import image
 
@@ -160,3 +165,102 @@ class PostCreateFormTests(TestCase):
             follow=True,
         )
         self.assertEqual(Comment.objects.count(), 0)
+
+
+@override_settings(MEDIA_ROOT=settings.MEDIA_TESTS, THUMBNAIL_WORKERS=0)
+class PostImageUploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = mixer.blend(User, username='TestUser')
+
+        cls.authorized_client = Client()
+
+        cls.authorized_client.force_login(cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(settings.MEDIA_TESTS, ignore_errors=True)
+        cache.clear()
+
+    def create_post(self, uploaded):
+        return self.authorized_client.post(
+            reverse('posts:post_create'),
+            {
+                'text': 'Пост с картинкой',
+                'image': uploaded,
+            },
+        )
+
+    @override_settings(MAX_UPLOAD_SIZE=100)
+    def test_oversized_upload_rejected(self):
+        """Слишком большой файл отклоняется с ошибкой формы."""
+        response = self.create_post(image('big.gif'))
+        self.assertFalse(Post.objects.exists())
+        errors = response.context['form'].errors['image']
+        self.assertIn('Файл больше', errors[0])
+
+    @override_settings(MAX_UPLOAD_SIZE=100)
+    def test_oversized_upload_rejected_on_edit(self):
+        """Слишком большой файл отклоняется и при редактировании поста."""
+        post = Post.objects.create(author=self.user, text='Пост без картинки')
+        response = self.authorized_client.post(
+            reverse('posts:post_edit', args=(post.pk,)),
+            {'text': post.text, 'image': image('big.gif')},
+        )
+        errors = response.context['form'].errors['image']
+        self.assertIn('Файл больше', errors[0])
+        post.refresh_from_db()
+        self.assertFalse(post.image)
+
+    def test_upload_checks_csrf(self):
+        """Загрузка без CSRF-токена отклоняется."""
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        response = client.post(
+            reverse('posts:post_create'),
+            {'text': 'Пост с картинкой', 'image': image('csrf.gif')},
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Post.objects.exists())
+
+    @override_settings(IMAGE_MAX_DIMENSIONS=(100, 100))
+    def test_large_dimensions_rejected(self):
+        """Картинка с размерами больше допустимых отклоняется."""
+        response = self.create_post(image('wide.gif'))
+        self.assertFalse(Post.objects.exists())
+        self.assertTrue(response.context['form'].has_error('image'))
+
+    def test_not_an_image_rejected(self):
+        """Файл, не являющийся картинкой, отклоняется."""
+        response = self.create_post(
+            SimpleUploadedFile('text.gif', b'not an image', 'image/gif'),
+        )
+        self.assertFalse(Post.objects.exists())
+        self.assertTrue(response.context['form'].has_error('image'))
+
+    @override_settings(IMAGE_MAX_SIDE=50)
+    def test_original_downsampled(self):
+        """Оригинал картинки уменьшается до допустимого размера."""
+        self.create_post(image('shrink.gif'))
+        post = Post.objects.get()
+        with Image.open(post.image.path) as stored:
+            self.assertEqual(stored.size, (50, 50))
+        self.assertNotEqual(post.image.name, 'posts/shrink.gif')
+        self.assertFalse(default_storage.exists('posts/shrink.gif'))
+
+    @override_settings(IMAGE_MAX_SIDE=50)
+    def test_original_kept_when_shrinking_fails(self):
+        """Если уменьшенная копия не записалась, оригинал остаётся."""
+        name = default_storage.save('posts/kept.gif', image('kept.gif'))
+        with mock.patch.object(
+            FileSystemStorage,
+            '_save',
+            side_effect=OSError,
+        ):
+            with self.assertRaises(OSError):
+                shrink_original(name)
+        with Image.open(default_storage.path(name)) as stored:
+            self.assertGreater(max(stored.size), 50)
@@ -0,0 +1,110 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+SEED_AUTHORS = 20
+SEED_GROUPS = 5
+SEED_POSTS = 400
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}')
+        else:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+
+
+def uses_index(plan, table):
+    if connection.vendor == 'postgresql':
+        return f'Seq Scan on {table}' not in plan and 'Sort' not in plan
+    table_steps = [line for line in plan.splitlines() if table in line]
+    return (
+        bool(table_steps)
+        and all(
+            'USING' in line and 'INDEX' in line or 'PRIMARY KEY' in line
+            for line in table_steps
+        )
+        and 'TEMP B-TREE' not in plan
+    )
+
+
+class FeedIndexesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = mixer.blend(User, username='reader')
+        authors = mixer.cycle(SEED_AUTHORS).blend(User)
+        groups = mixer.cycle(SEED_GROUPS).blend(Group)
+        Post.objects.bulk_create(
+            Post(
+                author=authors[number % SEED_AUTHORS],
+                group=groups[number % SEED_GROUPS],
+                text=f'{number}',
+            )
+            for number in range(SEED_POSTS)
+        )
+        cls.post = Post.objects.first()
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=author, text='Комментарий')
+            for author in authors
+        )
+        for author in authors[:3]:
+            Follow.objects.create(user=cls.user, author=author)
+        cls.author = authors[0]
+        cls.group = groups[0]
+
+        cls.authorized_client = Client()
+
+        cls.authorized_client.force_login(cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def main_query(self, url, table):
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(url)
+        for query in queries.captured_queries:
+            sql = query['sql']
+            if 'ORDER BY' in sql and f'FROM "{table}"' in sql:
+                return sql
+        self.fail(f'Запрос к {table} не найден для {url}')
+
+    def test_feed_queries_use_indexes(self):
+        """Основные запросы лент используют индексы без сортировки."""
+        cases = (
+            (reverse('posts:index'), 'posts_post'),
+            (
+                reverse('posts:group_list', args=(self.group.slug,)),
+                'posts_post',
+            ),
+            (
+                reverse('posts:profile', args=(self.author.username,)),
+                'posts_post',
+            ),
+            (reverse('posts:follow_index'), 'posts_post'),
+            (
+                reverse('posts:post_detail', args=(self.post.id,)),
+                'posts_comment',
+            ),
+        )
+        for url, table in cases:
+            with self.subTest(url=url):
+                plan = explain(self.main_query(url, table))
+                self.assertTrue(uses_index(plan, table), plan)
+
+    def test_follow_is_unique(self):
+        """Повторная подписка на автора запрещена на уровне БД."""
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Follow.objects.create(user=self.user, author=self.author)
@@ -1,9 +1,19 @@
+from io import StringIO
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
 from mixer.backend.django import mixer
 
 from core.utils import truncatechars
-from posts.models import GROUP_CHARACTER_LIMIT
+from posts.models import (
+    GROUP_CHARACTER_LIMIT,
+    Follow,
+    GroupAuthorStats,
+    GroupStats,
+    Post,
+    UserStats,
+)
 
 User = get_user_model()
 
@@ -182,3 +192,106 @@ class FollowModelTest(TestCase):
                     self.follow._meta.get_field(field).verbose_name,
                     verbose,
                 )
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = mixer.blend(User, username='auth')
+        cls.author = mixer.blend(User, username='author')
+
+    def stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_counters_follow_writes_and_deletes(self):
+        """Счётчики меняются при создании и удалении объектов."""
+        post = mixer.blend('posts.Post', author=self.author)
+        comment = mixer.blend('posts.Comment', post=post, author=self.user)
+        follow = Follow.objects.create(user=self.user, author=self.author)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.user).following_count, 1)
+
+        comment.delete()
+        follow.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+        self.assertEqual(self.stats(self.user).following_count, 0)
+        post.delete()
+        self.assertEqual(self.stats(self.author).posts_count, 0)
+
+    def test_reconcile_counters_command(self):
+        """Команда reconcile_counters исправляет рассинхронизацию."""
+        post = mixer.blend('posts.Post', author=self.author)
+        mixer.cycle(2).blend('posts.Comment', post=post, author=self.user)
+        Follow.objects.create(user=self.user, author=self.author)
+        UserStats.objects.update(
+            posts_count=7,
+            followers_count=7,
+            following_count=7,
+        )
+        Post.objects.update(comments_count=7)
+        call_command('reconcile_counters', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 2)
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.author).following_count, 0)
+        self.assertEqual(self.stats(self.user).following_count, 1)
+
+
+class GroupStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = mixer.blend(User, username='auth')
+        cls.author = mixer.blend(User, username='author')
+        cls.group = mixer.blend('posts.Group')
+        cls.other = mixer.blend('posts.Group')
+
+    def stats(self, group):
+        return GroupStats.objects.get(group=group)
+
+    def test_stats_follow_posts(self):
+        """Статистика группы меняется при создании, переносе и удалении."""
+        mixer.cycle(2).blend(
+            'posts.Post',
+            author=self.author,
+            group=self.group,
+        )
+        post = mixer.blend('posts.Post', author=self.user, group=self.group)
+        stats = self.stats(self.group)
+        self.assertEqual(stats.posts_count, 3)
+        self.assertEqual(stats.last_activity, post.pub_date)
+        self.assertEqual(stats.top_authors_list, ['author', 'auth'])
+
+        post.group = self.other
+        post.save()
+        self.assertEqual(self.stats(self.group).posts_count, 2)
+        self.assertEqual(self.stats(self.group).top_authors_list, ['author'])
+        self.assertEqual(self.stats(self.other).posts_count, 1)
+
+        post.delete()
+        other = self.stats(self.other)
+        self.assertEqual(other.posts_count, 0)
+        self.assertIsNone(other.last_activity)
+        self.assertEqual(other.top_authors, '')
+        self.assertFalse(
+            GroupAuthorStats.objects.filter(group=self.other).exists(),
+        )
+
+    def test_reconcile_counters_command(self):
+        """Команда reconcile_counters пересчитывает статистику групп."""
+        post = mixer.blend('posts.Post', author=self.author, group=self.group)
+        GroupStats.objects.update(posts_count=7, top_authors='nobody')
+        GroupAuthorStats.objects.all().delete()
+        call_command('reconcile_counters', stdout=StringIO())
+        stats = self.stats(self.group)
+        self.assertEqual(stats.posts_count, 1)
+        self.assertEqual(stats.last_activity, post.pub_date)
+        self.assertEqual(stats.top_authors_list, ['author'])
+        self.assertEqual(self.stats(self.other).posts_count, 0)
@@ -0,0 +1,91 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from mixer.backend.django import mixer
+
+from posts import recommendations
+from posts.follow_cache import follow_cache
+from posts.models import Follow, Suggestion
+
+User = get_user_model()
+
+
+class RecommendationsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        names = ('reader', 'a', 'b', 'c', 'd', 'e', 'other')
+        cls.users = {name: mixer.blend(User, username=name) for name in names}
+        edges = (
+            ('reader', 'a'),
+            ('reader', 'b'),
+            ('a', 'c'),
+            ('b', 'c'),
+            ('a', 'd'),
+            ('other', 'a'),
+            ('other', 'e'),
+        )
+        for user, author in edges:
+            Follow.objects.create(
+                user=cls.users[user],
+                author=cls.users[author],
+            )
+
+        cls.reader_client = Client()
+
+        cls.reader_client.force_login(cls.users['reader'])
+
+    def setUp(self):
+        cache.clear()
+        follow_cache.clear()
+
+    def scores(self, name):
+        return {
+            suggestion.author.username: (suggestion.score, suggestion.mutual)
+            for suggestion in Suggestion.objects.filter(
+                user=self.users[name],
+            ).select_related('author')
+        }
+
+    def test_friends_of_friends_and_cofollow_scores(self):
+        """Очки складываются из путей через подписки и общих читателей."""
+        recommendations.rebuild()
+        self.assertEqual(
+            self.scores('reader'),
+            {
+                'c': (2 * recommendations.FRIENDS_WEIGHT, 2),
+                'd': (recommendations.FRIENDS_WEIGHT, 1),
+                'e': (recommendations.COFOLLOW_WEIGHT, 0),
+            },
+        )
+
+    @override_settings(RECOMMENDATIONS_STORED=1)
+    def test_only_top_n_are_stored(self):
+        """Для каждого читателя хранятся только лучшие кандидаты."""
+        recommendations.rebuild()
+        self.assertEqual(list(self.scores('reader')), ['c'])
+
+    @override_settings(RECOMMENDATIONS_MAX_FOLLOWERS=1)
+    def test_popular_authors_are_not_bridges(self):
+        """Популярные авторы не связывают читателей совместной подпиской."""
+        recommendations.rebuild()
+        self.assertNotIn('e', self.scores('reader'))
+
+    def test_sidebar_skips_new_follows(self):
+        """Лента подписок показывает рекомендации без новых подписок."""
+        call_command('build_recommendations', stdout=StringIO())
+        Follow.objects.create(
+            user=self.users['reader'],
+            author=self.users['c'],
+        )
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        self.assertEqual(
+            [s.author.username for s in response.context['suggestions']],
+            ['d', 'e'],
+        )
+        self.assertContains(response, 'Кого почитать')
@@ -0,0 +1,94 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils.http import urlencode
+from mixer.backend.django import mixer
+
+from posts import search
+from posts.models import Post, SearchTerm
+
+User = get_user_model()
+
+
+class SearchViewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = mixer.blend(User, username='TestUser')
+
+        cls.anon = Client()
+
+        cls.often = mixer.blend(
+            'posts.Post',
+            author=cls.user,
+            text='Кот и кот, опять кот у окна',
+        )
+        cls.once = mixer.blend(
+            'posts.Post',
+            author=cls.user,
+            text='Кот спит у окна',
+        )
+        cls.other = mixer.blend(
+            'posts.Post',
+            author=cls.user,
+            text='Собака гуляет во дворе',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, query, **params):
+        return self.anon.get(
+            reverse('posts:search'),
+            {'q': query, **params},
+        )
+
+    def test_search_ranks_matches(self):
+        """Поиск находит посты со всеми словами и ранжирует их."""
+        response = self.search('кот окна')
+        self.assertEqual(
+            list(response.context['page_obj']),
+            [self.often, self.once],
+        )
+        self.assertFalse(self.search('кот собака').context['page_obj'])
+
+    def test_index_follows_edits_and_deletes(self):
+        """Индекс обновляется при изменении и удалении поста."""
+        self.other.text = 'Кот во дворе'
+        self.other.save()
+        self.assertIn(self.other, self.search('дворе').context['page_obj'])
+        self.assertFalse(self.search('собака').context['page_obj'])
+        self.other.delete()
+        self.assertFalse(SearchTerm.objects.filter(term='дворе').exists())
+
+    def test_document_count_follows_creates_and_deletes(self):
+        """Число постов для IDF кэшируется до создания или удаления."""
+        self.assertEqual(search.document_count(), 3)
+        with self.assertNumQueries(0):
+            self.assertEqual(search.document_count(), 3)
+        post = mixer.blend('posts.Post', author=self.user)
+        self.assertEqual(search.document_count(), 4)
+        Post.objects.get(pk=self.other.pk).delete()
+        post.delete()
+        self.assertEqual(search.document_count(), 2)
+
+    def test_search_pages_keep_query(self):
+        """Курсор следующей страницы сохраняет поисковый запрос."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Облако номер {number}')
+            for number in range(12)
+        )
+        for post in Post.objects.filter(text__startswith='Облако'):
+            post.save()
+        first = self.search('облако')
+        page = first.context['page_obj']
+        self.assertTrue(page.has_next())
+        self.assertContains(
+            first,
+            f'{urlencode({"q": "облако"})}&cursor={page.next_cursor}',
+        )
+        second = self.search('облако', cursor=page.next_cursor)
+        self.assertEqual(len(page) + len(second.context['page_obj']), 12)
+        self.assertFalse(set(page) & set(second.context['page_obj']))
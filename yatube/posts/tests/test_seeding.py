@@ -0,0 +1,89 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.test import TestCase
+
+from posts.models import Comment, Follow, Post, UserStats
+from posts.seeding import BASE_DATE, seed
+
+
+class SeedingTest(TestCase):
+    def texts(self, prefix):
+        return list(
+            Post.objects.filter(author__username__startswith=f'{prefix}_')
+            .order_by('pk')
+            .values_list('text', flat=True),
+        )
+
+    def rows(self, prefix):
+        """Данные без pk: посты по дате и комментарии к ним."""
+        posts = list(
+            Post.objects.filter(author__username__startswith=f'{prefix}_')
+            .order_by('pub_date')
+            .values_list('pub_date', 'updated', 'text', 'group__title'),
+        )
+        comments = list(
+            Comment.objects.filter(
+                author__username__startswith=f'{prefix}_',
+            )
+            .order_by('created', 'text')
+            .values_list('created', 'text', 'post__pub_date'),
+        )
+        return posts, comments
+
+    def test_same_seed_gives_same_data(self):
+        """Одинаковое зерно и размер пачки дают одинаковые данные."""
+        options = dict(users=4, groups=2, posts=15, comments=5, follows=5)
+        seed(prefix='first', batch_size=4, **options)
+        seed(prefix='second', batch_size=4, **options)
+        seed(prefix='third', batch_size=4, seed=1, **options)
+        self.assertEqual(self.texts('first'), self.texts('second'))
+        self.assertNotEqual(self.texts('first'), self.texts('third'))
+        self.assertEqual(self.rows('first'), self.rows('second'))
+
+    def test_dates_do_not_depend_on_clock(self):
+        """Даты постов и комментариев задаются зерном, а не временем."""
+        seed(users=3, groups=1, posts=10, comments=10, follows=2)
+        dates = Post.objects.order_by('pub_date').values_list(
+            'pub_date',
+            flat=True,
+        )
+        self.assertEqual(dates[0].date(), BASE_DATE.date())
+        self.assertEqual(len(set(dates)), 10)
+        self.assertFalse(
+            Comment.objects.filter(created__lt=F('post__pub_date')).exists(),
+        )
+
+    def test_follows_are_unique_and_not_self(self):
+        """Подписки не повторяются и не ведут на самого себя."""
+        dataset = seed(users=4, groups=1, posts=4, comments=0, follows=20)
+        self.assertEqual(dataset['follows'], 12)
+        self.assertEqual(Follow.objects.count(), 12)
+        self.assertFalse(
+            Follow.objects.values('user', 'author')
+            .annotate(total=Count('pk'))
+            .filter(total__gt=1)
+            .exists(),
+        )
+        self.assertFalse(
+            Follow.objects.filter(user_id=F('author_id')).exists(),
+        )
+
+    def test_command_creates_rows(self):
+        """Команда seed_yatube создаёт данные пачками."""
+        call_command(
+            'seed_yatube',
+            users=3,
+            groups=1,
+            posts=7,
+            comments=9,
+            follows=3,
+            batch_size=2,
+            workers=2,
+            stdout=StringIO(),
+            stderr=StringIO(),
+        )
+        self.assertEqual(Post.objects.count(), 7)
+        self.assertEqual(Comment.objects.count(), 9)
+        self.assertEqual(UserStats.objects.count(), 3)
@@ -0,0 +1,119 @@
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from mixer.backend.django import mixer
+
+from posts import trending
+from posts.models import Post
+
+User = get_user_model()
+
+
+class TrendingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = mixer.blend(User, username='TestUser')
+
+        cls.anon = Client()
+
+    def age(self, post, hours):
+        """Переносит публикацию поста в прошлое."""
+        pub_date = timezone.now() - timedelta(hours=hours)
+        Post.objects.filter(pk=post.pk).update(
+            pub_date=pub_date,
+            trending_score=trending.event_score(
+                pub_date,
+                trending.POST_WEIGHT,
+            ),
+        )
+
+    def test_score_halves_after_half_life(self):
+        """Вес события падает вдвое за период полураспада."""
+        now = timezone.now()
+        later = now + timedelta(hours=settings.TRENDING_HALF_LIFE)
+        self.assertAlmostEqual(
+            trending.event_score(later, 1) - trending.event_score(now, 1),
+            math.log(2),
+        )
+
+    def test_comment_updates_score_incrementally(self):
+        """Комментарий добавляет событие к рейтингу одним UPDATE."""
+        post = mixer.blend('posts.Post', author=self.user)
+        comment = mixer.blend('posts.Comment', post=post, author=self.user)
+        post.refresh_from_db()
+        self.assertAlmostEqual(
+            post.trending_score,
+            trending.combine(
+                (
+                    trending.event_score(post.pub_date, trending.POST_WEIGHT),
+                    trending.event_score(
+                        comment.created,
+                        trending.COMMENT_WEIGHT,
+                    ),
+                ),
+            ),
+        )
+        Post.objects.update(trending_score=None)
+        trending.rebuild()
+        self.assertAlmostEqual(
+            Post.objects.get(pk=post.pk).trending_score,
+            post.trending_score,
+        )
+
+    def test_event_scores_post_without_score(self):
+        """Событие задаёт рейтинг посту, у которого его не было."""
+        post = mixer.blend('posts.Post', author=self.user)
+        Post.objects.filter(pk=post.pk).update(trending_score=None)
+        now = timezone.now()
+        trending.add_event(post.pk, now, trending.COMMENT_WEIGHT)
+        post.refresh_from_db()
+        self.assertAlmostEqual(
+            post.trending_score,
+            trending.event_score(now, trending.COMMENT_WEIGHT),
+        )
+
+    def test_active_old_post_outranks_quiet_new_post(self):
+        """Старый обсуждаемый пост выше нового без комментариев."""
+        discussed = mixer.blend('posts.Post', author=self.user)
+        self.age(discussed, 24)
+        mixer.cycle(20).blend('posts.Comment', post=discussed)
+        quiet = mixer.blend('posts.Post', author=self.user)
+        stale = mixer.blend('posts.Post', author=self.user)
+        self.age(stale, 48)
+        response = self.anon.get(reverse('posts:trending'))
+        self.assertEqual(
+            list(response.context['page_obj']),
+            [discussed, quiet, stale],
+        )
+
+    def test_trending_page_is_keyset_paginated(self):
+        """Лента популярного листается курсорами без COUNT(*)."""
+        posts = mixer.cycle(settings.POSTS_QUANTITY + 3).blend(
+            'posts.Post',
+            author=self.user,
+        )
+        url = reverse('posts:trending')
+        seen = []
+        cursor = ''
+        while cursor is not None:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.anon.get(url, {'cursor': cursor})
+            self.assertFalse(
+                any('COUNT(' in query['sql'] for query in queries),
+            )
+            page = response.context['page_obj']
+            seen += list(page)
+            cursor = page.next_cursor
+        self.assertEqual(
+            seen,
+            sorted(posts, key=lambda post: -post.trending_score),
+        )
@@ -36,6 +36,7 @@ class PostURLTests(TestCase):
         cls.urls = {
             'add_comment': reverse('posts:add_comment', args=(cls.post.id,)),
             'follow_index': reverse('posts:follow_index'),
+            'group_index': reverse('posts:group_index'),
             'group_list': reverse('posts:group_list', args=(cls.group.slug,)),
             'index': reverse('posts:index'),
             'post_create': reverse('posts:post_create'),
@@ -67,6 +68,7 @@ class PostURLTests(TestCase):
                 HTTPStatus.OK,
                 self.authorized_client,
             ),
+            (self.urls.get('group_index'), HTTPStatus.OK, self.anon),
             (self.urls.get('group_list'), HTTPStatus.OK, self.anon),
             (self.urls.get('index'), HTTPStatus.OK, self.anon),
             (self.urls.get('post_create'), HTTPStatus.FOUND, self.anon),
@@ -152,6 +154,11 @@ class PostURLTests(TestCase):
                 'posts/follow.html',
                 self.authorized_client,
             ),
+            (
+                self.urls.get('group_index'),
+                'posts/group_index.html',
+                self.anon,
+            ),
             (self.urls.get('group_list'), 'posts/group_list.html', self.anon),
             (self.urls.get('index'), 'posts/index.html', self.anon),
             (
@@ -4,11 +4,21 @@ from django import forms
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
+from django.db import connection
 from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from mixer.backend.django import mixer
 
-from posts.models import Follow, Post
+from core import thumbnails
+from core.paginator import (
+    CachedCountPaginator,
+    KeysetPaginator,
+    elided_page_range,
+)
+from core.thumbnails import ready_thumbnail, resolve_thumbnails
+from posts import timeline, versions
+from posts.models import Follow, Post, TimelineEntry
 from posts.tests.common import image
 
 User = get_user_model()
@@ -66,13 +76,27 @@ class PostsViewsTest(TestCase):
         post = mixer.blend('posts.Post', author=self.user)
 
         response = self.authorized_client.get(reverse('posts:index'))
-        post.delete()
+        Post.objects.filter(pk=post.pk).update(text='Без сигналов')
         old_response = self.authorized_client.get(reverse('posts:index'))
         self.assertEqual(response.content, old_response.content)
         cache.clear()
         new_response = self.authorized_client.get(reverse('posts:index'))
         self.assertNotEqual(old_response.content, new_response.content)
 
+    def test_cache_index_page_invalidated_on_write(self):
+        """Кэш главной страницы сбрасывается при изменении постов."""
+        post = mixer.blend('posts.Post', author=self.user)
+
+        response = self.authorized_client.get(reverse('posts:index'))
+        post.delete()
+        new_response = self.authorized_client.get(reverse('posts:index'))
+        self.assertNotEqual(response.content, new_response.content)
+        mixer.blend('posts.Post', author=self.user, text='Свежий пост')
+        self.assertContains(
+            self.authorized_client.get(reverse('posts:index')),
+            'Свежий пост',
+        )
+
 
 @override_settings(MEDIA_ROOT=settings.MEDIA_TESTS)
 class ContextViewsTest(TestCase):
@@ -187,6 +211,283 @@ class ContextViewsTest(TestCase):
         self.assertNotIn(group, response.context['page_obj'])
 
 
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = mixer.blend(User, username='TestUser')
+
+        cls.authorized_client = Client()
+
+        cls.authorized_client.force_login(cls.user)
+
+        cls.post = mixer.blend('posts.Post', author=cls.user, text='Старый')
+        cls.url = reverse('posts:profile', args=(cls.user.username,))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_post_card_fragment_is_reused(self):
+        """Карточка поста берётся из кэша, пока пост не изменён."""
+        self.authorized_client.get(self.url)
+        Post.objects.filter(pk=self.post.pk).update(text='Без сигналов')
+        self.assertContains(self.authorized_client.get(self.url), 'Старый')
+
+    def test_post_card_fragment_invalidated_on_edit(self):
+        """Редактирование поста сбрасывает кэш его карточки."""
+        self.authorized_client.get(self.url)
+        self.authorized_client.post(
+            reverse('posts:post_edit', args=(self.post.id,)),
+            {'text': 'Новый'},
+        )
+        for url in (self.url, reverse('posts:index')):
+            with self.subTest(url=url):
+                response = self.authorized_client.get(url)
+                self.assertContains(response, 'Новый')
+                self.assertNotContains(response, 'Старый')
+
+    def test_post_card_fragment_invalidated_on_author_rename(self):
+        """Переименование автора сбрасывает кэш карточек его постов."""
+        self.authorized_client.get(self.url)
+        User.objects.filter(pk=self.user.pk).update(
+            first_name='Переименованный',
+        )
+        self.assertContains(
+            self.authorized_client.get(self.url),
+            'Переименованный',
+        )
+
+
+class GroupIndexViewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = mixer.blend(User, username='TestUser')
+        cls.groups = mixer.cycle(3).blend('posts.Group')
+        mixer.cycle(2).blend(
+            'posts.Post',
+            author=cls.user,
+            group=cls.groups[0],
+        )
+
+        cls.anon = Client()
+
+    def test_directory_lists_groups_with_stats(self):
+        """Каталог групп показывает статистику одним запросом."""
+        with self.assertNumQueries(1):
+            response = self.anon.get(reverse('posts:group_index'))
+        self.assertTemplateUsed(response, 'posts/group_index.html')
+        self.assertEqual(len(response.context['groups']), 3)
+        self.assertContains(response, 'Постов: 2')
+        self.assertContains(
+            response,
+            reverse('posts:profile', args=(self.user.username,)),
+        )
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = mixer.blend(User, username='TestUser')
+        cls.reader = mixer.blend(User, username='Reader')
+        cls.group = mixer.blend('posts.Group', slug='test-slug')
+        cls.post = mixer.blend(
+            'posts.Post',
+            author=cls.user,
+            group=cls.group,
+        )
+
+        cls.anon = Client()
+        cls.reader_client = Client()
+
+        cls.reader_client.force_login(cls.reader)
+
+        cls.urls = (
+            reverse('posts:post_detail', args=(cls.post.pk,)),
+            reverse('posts:profile', args=(cls.user.username,)),
+            reverse('posts:group_list', args=(cls.group.slug,)),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def revalidate(self, client, url):
+        response = client.get(url)
+        self.assertFalse(response.has_header('Last-Modified'))
+        return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_not_modified_without_rendering(self):
+        """Неизменившаяся страница отдаётся как 304 без рендера."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.revalidate(self.anon, url)
+                self.assertEqual(response.status_code, 304)
+                self.assertTemplateNotUsed(response, 'includes/header.html')
+                self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_etag_depends_on_user(self):
+        """Разные пользователи получают разные ETag."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertNotEqual(
+                    self.anon.get(url)['ETag'],
+                    self.reader_client.get(url)['ETag'],
+                )
+
+    def test_writes_change_etag(self):
+        """Комментарий, подписка и новый пост меняют ETag страниц."""
+        detail, profile, group = self.urls
+        writes = (
+            (
+                detail,
+                lambda: self.reader_client.post(
+                    reverse('posts:add_comment', args=(self.post.pk,)),
+                    {'text': 'Комментарий'},
+                ),
+            ),
+            (
+                profile,
+                lambda: self.reader_client.get(
+                    reverse(
+                        'posts:profile_follow',
+                        args=(self.user.username,),
+                    ),
+                ),
+            ),
+            (
+                group,
+                lambda: mixer.blend(
+                    'posts.Post',
+                    author=self.reader,
+                    group=self.group,
+                ),
+            ),
+        )
+        for url, write in writes:
+            with self.subTest(url=url):
+                etag = self.reader_client.get(url)['ETag']
+                write()
+                response = self.reader_client.get(
+                    url,
+                    HTTP_IF_NONE_MATCH=etag,
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_moving_post_changes_old_group(self):
+        """Перенос поста в другую группу меняет ETag прежней группы."""
+        url = self.urls[2]
+        etag = self.anon.get(url)['ETag']
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = mixer.blend('posts.Group')
+        post.save()
+        response = self.anon.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_missing_objects(self):
+        """Для несуществующих объектов по-прежнему отдаётся 404."""
+        urls = (
+            reverse('posts:post_detail', args=(self.post.pk + 100,)),
+            reverse('posts:profile', args=('nobody',)),
+            reverse('posts:group_list', args=('nothing',)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.anon.get(url).status_code, 404)
+
+
+@override_settings(MEDIA_ROOT=settings.MEDIA_TESTS, THUMBNAIL_WORKERS=0)
+class ThumbnailViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = mixer.blend(User, username='TestUser')
+
+        cls.authorized_client = Client()
+
+        cls.authorized_client.force_login(cls.user)
+
+        cls.url = reverse('posts:profile', args=(cls.user.username,))
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(settings.MEDIA_TESTS, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_thumbnail_prepared_on_upload(self):
+        """Миниатюра готовится при загрузке и выводится на странице."""
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            {'text': 'С картинкой', 'image': image('thumb.gif')},
+        )
+        post = Post.objects.get()
+        thumbnail = ready_thumbnail(post.image, 'post_card')
+        self.assertIsNotNone(thumbnail)
+        response = self.authorized_client.get(self.url)
+        self.assertContains(response, thumbnail.url)
+
+    def test_page_thumbnails_resolved_in_one_lookup(self):
+        """Миниатюры страницы читаются из хранилища одним запросом."""
+        for number in range(3):
+            Post.objects.create(
+                author=self.user,
+                text=f'{number}',
+                image=image(f'batch_{number}.gif'),
+            )
+        posts = list(Post.objects.all())
+        cache.clear()
+        with self.assertNumQueries(1):
+            resolve_thumbnails(posts, 'post_card')
+        with self.assertNumQueries(0):
+            resolve_thumbnails(posts, 'post_card')
+        for post in posts:
+            with self.subTest(post=post):
+                self.assertEqual(
+                    post.thumbnails['post_card'].url,
+                    ready_thumbnail(post.image, 'post_card').url,
+                )
+
+    @override_settings(THUMBNAIL_WORKERS=1)
+    def test_placeholder_until_thumbnail_ready(self):
+        """Пока миниатюра не готова, выводится заглушка."""
+        post = Post.objects.create(
+            author=self.user,
+            text='Ждёт миниатюру',
+            image=image('pending.gif'),
+        )
+        self.assertIsNone(ready_thumbnail(post.image, 'post_card'))
+        response = self.authorized_client.get(self.url)
+        self.assertContains(response, 'bg-light')
+        self.assertNotContains(response, '<img class="card-img')
+
+    @override_settings(THUMBNAIL_WORKERS=1)
+    def test_cached_index_shows_thumbnail_once_ready(self):
+        """Закэшированная главная показывает миниатюру, когда она готова."""
+        post = Post.objects.create(
+            author=self.user,
+            text='Ждёт миниатюру',
+            image=image('index.gif'),
+        )
+        url = reverse('posts:index')
+        self.assertNotContains(
+            self.authorized_client.get(url),
+            '<img class="card-img',
+        )
+        thumbnails.generate(post.image.name)
+        self.assertContains(
+            self.authorized_client.get(url),
+            ready_thumbnail(post.image, 'post_card').url,
+        )
+
+
 class FollowViewsTest(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -285,6 +586,9 @@ class PaginatorViewsTest(TestCase):
             ),
         ]
 
+    def setUp(self):
+        cache.clear()
+
     def test_first_page_contains_ten_records(self):
         """
         Paginator предоставляет ожидаемое количество постов на первую страницу.
@@ -306,3 +610,305 @@ class PaginatorViewsTest(TestCase):
             with self.subTest(reverse_name=reverse_name):
                 response = self.authorized_client.get(reverse_name + '?page=2')
                 self.assertEqual(len(response.context['page_obj']), 3)
+
+
+@override_settings(
+    KEYSET_PAGINATED_VIEWS=(
+        'posts:index',
+        'posts:group_list',
+        'posts:profile',
+    ),
+)
+class KeysetPaginatorViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = mixer.blend(User, username='TestUser')
+
+        cls.authorized_client = Client()
+
+        cls.authorized_client.force_login(cls.user)
+
+        cls.group = mixer.blend('posts.Group', title='Тестовая группа')
+        Post.objects.bulk_create(
+            Post(author=cls.user, group=cls.group, text=f'{number}')
+            for number in range(13)
+        )
+        cls.urls = [
+            reverse('posts:index'),
+            reverse(
+                'posts:group_list',
+                args=(cls.group.slug,),
+            ),
+            reverse(
+                'posts:profile',
+                args=(cls.user.username,),
+            ),
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cache.clear()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_pages_follow_cursors(self):
+        """Курсоры ведут на следующую и предыдущую страницы без повторов."""
+        for reverse_name in self.urls:
+            with self.subTest(reverse_name=reverse_name):
+                first = self.authorized_client.get(reverse_name)
+                first_page = first.context['page_obj']
+                self.assertEqual(len(first_page), settings.POSTS_QUANTITY)
+                self.assertFalse(first_page.has_previous())
+                second_page = self.authorized_client.get(
+                    reverse_name,
+                    {'cursor': first_page.next_cursor},
+                ).context['page_obj']
+                self.assertEqual(len(second_page), 3)
+                self.assertFalse(second_page.has_next())
+                self.assertFalse(set(first_page) & set(second_page))
+                previous_page = self.authorized_client.get(
+                    reverse_name,
+                    {'cursor': second_page.previous_cursor},
+                ).context['page_obj']
+                self.assertEqual(list(previous_page), list(first_page))
+                self.assertContains(first, first_page.next_cursor)
+
+    def test_invalid_cursor_returns_first_page(self):
+        """Испорченный курсор возвращает первую страницу."""
+        response = self.authorized_client.get(
+            reverse('posts:index'),
+            {'cursor': 'broken'},
+        )
+        self.assertEqual(
+            len(response.context['page_obj']),
+            settings.POSTS_QUANTITY,
+        )
+        self.assertFalse(response.context['page_obj'].has_previous())
+
+    def test_keyset_page_skips_count(self):
+        """Постраничный вывод по ключу не выполняет COUNT(*)."""
+        paginator = KeysetPaginator(
+            Post.objects.all(),
+            settings.POSTS_QUANTITY,
+        )
+        with self.assertNumQueries(1):
+            page = paginator.get_page(None)
+        with self.assertNumQueries(1):
+            paginator.get_page(page.next_cursor)
+
+
+class CachedCountPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = mixer.blend(User, username='TestUser')
+        cls.group = mixer.blend('posts.Group', title='Тестовая группа')
+        Post.objects.bulk_create(
+            Post(author=cls.user, group=cls.group, text=f'{number}')
+            for number in range(60)
+        )
+        cls.scopes = (versions.group_scope(cls.group.pk),)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_count_is_cached_until_post_created(self):
+        """COUNT(*) повторяется только после создания поста."""
+        posts = Post.objects.filter(group=self.group)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                CachedCountPaginator(posts, 10, self.scopes).count,
+                60,
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                CachedCountPaginator(posts, 10, self.scopes).count,
+                60,
+            )
+        Post.objects.create(author=self.user, group=self.group, text='Ещё')
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                CachedCountPaginator(posts, 10, self.scopes).count,
+                61,
+            )
+
+    def test_count_kept_when_other_group_changes(self):
+        """Пост в другой группе не сбрасывает количество этой группы."""
+        posts = Post.objects.filter(group=self.group)
+        CachedCountPaginator(posts, 10, self.scopes).count
+        Post.objects.create(
+            author=mixer.blend(User),
+            group=mixer.blend('posts.Group'),
+            text='Чужой пост',
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                CachedCountPaginator(posts, 10, self.scopes).count,
+                60,
+            )
+
+    def test_feed_count_follows_authors(self):
+        """Число постов в ленте хранится под одним поколением читателя."""
+        reader = mixer.blend(User)
+        for author in [self.user] + mixer.cycle(3).blend(User):
+            Follow.objects.create(user=reader, author=author)
+        posts = timeline.feed(reader)
+        scopes = timeline.feed_scopes(reader, timeline.pull_authors(reader))
+        self.assertEqual(scopes, [timeline.timeline_scope(reader.pk)])
+        self.assertEqual(CachedCountPaginator(posts, 10, scopes).count, 60)
+        Post.objects.create(author=mixer.blend(User), text='Чужой пост')
+        with self.assertNumQueries(0):
+            CachedCountPaginator(posts, 10, scopes).count
+        post = Post.objects.create(author=self.user, text='Ещё')
+        self.assertEqual(CachedCountPaginator(posts, 10, scopes).count, 61)
+        post.delete()
+        self.assertEqual(CachedCountPaginator(posts, 10, scopes).count, 60)
+
+    def test_count_invalidated_when_group_changes(self):
+        """Перенос поста в другую группу меняет количество в обеих."""
+        posts = Post.objects.filter(group=self.group)
+        CachedCountPaginator(posts, 10, self.scopes).count
+        post = Post.objects.filter(group=self.group).first()
+        post.group = mixer.blend('posts.Group')
+        post.save()
+        self.assertEqual(
+            CachedCountPaginator(posts, 10, self.scopes).count,
+            59,
+        )
+
+    def test_elided_page_range(self):
+        """Между краями и окном вокруг текущей страницы ставится пропуск."""
+        self.assertEqual(
+            list(elided_page_range(10, 20, on_each_side=2, on_ends=1)),
+            [1, None, 8, 9, 10, 11, 12, None, 20],
+        )
+        self.assertEqual(
+            list(elided_page_range(2, 6, on_each_side=2, on_ends=1)),
+            [1, 2, 3, 4, 5, 6],
+        )
+
+    @override_settings(PAGINATOR_ON_EACH_SIDE=1, PAGINATOR_ON_ENDS=1)
+    def test_paginator_renders_elided_links(self):
+        """Шаблон выводит окно ссылок вместо всех страниц."""
+        url = reverse('posts:group_list', args=(self.group.slug,))
+        response = self.client.get(url)
+        self.assertIsInstance(
+            response.context['page_obj'].paginator,
+            CachedCountPaginator,
+        )
+        self.assertContains(response, '…')
+        self.assertContains(response, 'page=6')
+        self.assertNotContains(response, 'page=4')
+
+
+class TimelineViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = mixer.blend(User, username='reader')
+        cls.author = mixer.blend(User, username='author')
+        cls.stranger = mixer.blend(User, username='stranger')
+
+        cls.authorized_client = Client()
+
+        cls.authorized_client.force_login(cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def feed(self):
+        return list(
+            self.authorized_client.get(
+                reverse('posts:follow_index'),
+            ).context['page_obj'],
+        )
+
+    def test_new_post_fans_out_to_followers(self):
+        """Новый пост автора попадает в ленты его подписчиков."""
+        Follow.objects.create(user=self.user, author=self.author)
+        post = mixer.blend('posts.Post', author=self.author)
+        mixer.blend('posts.Post', author=self.stranger)
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.user, post=post).exists(),
+        )
+        self.assertEqual(self.feed(), [post])
+
+    def test_follow_and_unfollow_update_timeline(self):
+        """Подписка добавляет старые посты автора, отписка убирает их."""
+        post = mixer.blend('posts.Post', author=self.author)
+        self.authorized_client.get(
+            reverse('posts:profile_follow', args=(self.author.username,)),
+        )
+        self.assertEqual(self.feed(), [post])
+        self.authorized_client.get(
+            reverse('posts:profile_unfollow', args=(self.author.username,)),
+        )
+        self.assertEqual(self.feed(), [])
+        self.assertFalse(TimelineEntry.objects.filter(user=self.user))
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_popular_author_is_read_on_demand(self):
+        """Посты авторов с большим числом подписчиков читаются при запросе."""
+        Follow.objects.create(user=self.user, author=self.author)
+        post = mixer.blend('posts.Post', author=self.author)
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self.feed(), [post])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_timeline_backfilled_when_author_drops_under_limit(self):
+        """Когда подписчиков снова не больше предела, лента заполняется."""
+        post = mixer.blend('posts.Post', author=self.author)
+        Follow.objects.create(user=self.stranger, author=self.author)
+        Follow.objects.create(user=self.user, author=self.author)
+        self.assertFalse(TimelineEntry.objects.filter(user=self.user))
+        Follow.objects.get(user=self.stranger, author=self.author).delete()
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.user, post=post).exists(),
+        )
+        self.assertEqual(self.feed(), [post])
+
+
+class PostDetailQueriesTest(TestCase):
+    QUERY_BUDGET = 6
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.user = mixer.blend(User, username='TestUser')
+
+        cls.authorized_client = Client()
+
+        cls.authorized_client.force_login(cls.user)
+
+        cls.group = mixer.blend('posts.Group', title='Тестовая группа')
+        cls.post = mixer.blend('posts.Post', author=cls.user, group=cls.group)
+        cls.url = reverse('posts:post_detail', args=(cls.post.id,))
+
+    def add_comments(self, count):
+        for author in mixer.cycle(count).blend(User):
+            mixer.blend('posts.Comment', post=self.post, author=author)
+
+    def get_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client.get(self.url)
+        return response, len(queries)
+
+    def test_post_detail_query_budget(self):
+        """Число запросов post_detail не зависит от числа комментариев."""
+        self.add_comments(3)
+        _, few = self.get_queries()
+        self.add_comments(settings.COMMENTS_QUANTITY * 2)
+        response, many = self.get_queries()
+        self.assertLessEqual(many, self.QUERY_BUDGET)
+        self.assertEqual(few, many)
+        self.assertEqual(
+            len(response.context['comments']),
+            settings.COMMENTS_QUANTITY,
+        )
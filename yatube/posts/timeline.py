@@ -0,0 +1,175 @@
+"""
+Материализованная лента подписок (fan-out-on-write).
+
+Новый пост сразу раскладывается по лентам подписчиков автора, поэтому
+страница подписок читает диапазон по индексу (user, pub_date) вместо
+соединения posts_follow с posts_post. Авторы, у которых подписчиков
+больше TIMELINE_FANOUT_LIMIT, не раскладываются: их посты подмешиваются
+при чтении (fan-out-on-read). Когда подписчиков снова становится не
+больше предела, посты автора раскладываются по всем лентам заново.
+
+Каждое изменение строк ленты увеличивает поколение timeline_scope
+читателя: по нему одному кэшируется число постов в ленте.
+"""
+
+from typing import List, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Q
+from django.db.models.query import QuerySet
+
+from core.cache import bump_generation
+from posts import versions
+from posts.models import Follow, Post, TimelineEntry, UserStats
+
+User = get_user_model()
+
+
+def is_fanout_author(author: User) -> bool:
+    return not UserStats.objects.filter(
+        user=author,
+        followers_count__gt=settings.TIMELINE_FANOUT_LIMIT,
+    ).exists()
+
+
+def timeline_scope(user_id: int) -> str:
+    return f'timeline:{user_id}'
+
+
+def touch_followers(author_id: int) -> None:
+    bump_generation(
+        *(
+            timeline_scope(user_id)
+            for user_id in Follow.objects.filter(
+                author_id=author_id,
+            ).values_list('user_id', flat=True)
+        ),
+    )
+
+
+def fan_out(post: Post) -> None:
+    if not is_fanout_author(post.author):
+        return
+    followers = list(
+        Follow.objects.filter(author=post.author).values_list(
+            'user_id',
+            flat=True,
+        ),
+    )
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+            for user_id in followers
+        ),
+        ignore_conflicts=True,
+    )
+    bump_generation(*(timeline_scope(user_id) for user_id in followers))
+
+
+def remove_post(post: Post) -> None:
+    # Строки лент удалены каскадом вместе с постом.
+    if is_fanout_author(post.author):
+        touch_followers(post.author_id)
+
+
+def add_author(user: User, author: User) -> None:
+    bump_generation(timeline_scope(user.pk))
+    if not is_fanout_author(author):
+        return
+    TimelineEntry.objects.bulk_create(
+        (
+            TimelineEntry(user=user, post_id=post_id, pub_date=pub_date)
+            for post_id, pub_date in Post.objects.filter(
+                author=author,
+            ).values_list('pk', 'pub_date')
+        ),
+        ignore_conflicts=True,
+    )
+
+
+def remove_author(user_id: int, author_id: int) -> None:
+    TimelineEntry.objects.filter(
+        user_id=user_id,
+        post__author_id=author_id,
+    ).delete()
+    bump_generation(timeline_scope(user_id))
+
+
+def resume_fan_out(author_id: int) -> None:
+    """
+    Вызывается после отписки. Если у автора снова ровно
+    TIMELINE_FANOUT_LIMIT подписчиков, его посты раскладываются заново:
+    у подписавшихся, пока автор читался при запросе, строк в ленте нет.
+    """
+    if not UserStats.objects.filter(
+        user_id=author_id,
+        followers_count=settings.TIMELINE_FANOUT_LIMIT,
+    ).exists():
+        return
+    quote = connection.ops.quote_name
+    entries, follows, posts = (
+        quote(model._meta.db_table) for model in (TimelineEntry, Follow, Post)
+    )
+    TimelineEntry.objects.filter(post__author_id=author_id).delete()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {entries} (user_id, post_id, pub_date) '
+            f'SELECT f.user_id, p.id, p.pub_date FROM {follows} f '
+            f'JOIN {posts} p ON p.author_id = f.author_id '
+            'WHERE f.author_id = %s',
+            [author_id],
+        )
+    touch_followers(author_id)
+
+
+def pull_authors(user: User) -> List[int]:
+    return list(
+        User.objects.filter(
+            following__user=user,
+            stats__followers_count__gt=settings.TIMELINE_FANOUT_LIMIT,
+        ).values_list('pk', flat=True),
+    )
+
+
+def feed_scopes(user: User, pulled: List[int]) -> List[str]:
+    """
+    Поколения, от которых зависит число постов в ленте: своё поколение
+    ленты читателя и посты авторов, которые подмешиваются при чтении
+    (их обычно нет или единицы).
+    """
+    return [timeline_scope(user.pk)] + [
+        versions.author_scope(author_id) for author_id in sorted(pulled)
+    ]
+
+
+def feed(user: User, pulled: Optional[List[int]] = None) -> QuerySet:
+    posts = Post.objects.select_related('author', 'group')
+    if pulled is None:
+        pulled = pull_authors(user)
+    if not pulled:
+        return posts.filter(timeline_entries__user=user).order_by(
+            '-timeline_entries__pub_date',
+        )
+    return posts.filter(
+        Q(pk__in=user.timeline.values('post_id')) | Q(author__in=pulled),
+    )
+
+
+def rebuild() -> None:
+    quote = connection.ops.quote_name
+    entries, follows, posts, stats = (
+        quote(model._meta.db_table)
+        for model in (TimelineEntry, Follow, Post, UserStats)
+    )
+    TimelineEntry.objects.all().delete()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {entries} (user_id, post_id, pub_date) '
+            f'SELECT f.user_id, p.id, p.pub_date FROM {follows} f '
+            f'JOIN {posts} p ON p.author_id = f.author_id '
+            f'LEFT JOIN {stats} s ON s.user_id = f.author_id '
+            'WHERE COALESCE(s.followers_count, 0) <= %s',
+            [settings.TIMELINE_FANOUT_LIMIT],
+        )
@@ -0,0 +1,98 @@
+"""
+Рейтинг популярных постов с экспоненциальным затуханием.
+
+Каждое событие (публикация поста или комментарий) даёт посту вес w,
+который со временем убывает как exp(-(now - t) / tau). Вместо суммы
+затухающих весов хранится её логарифм относительно фиксированной эпохи:
+
+    score = ln(sum(w * exp((t - EPOCH) / tau)))
+
+Текущее значение отличается от него общим для всех постов множителем,
+поэтому порядок по score и есть порядок по популярности на данный
+момент, а пересчитывать старые посты не нужно. Новое событие добавляется
+одним атомарным UPDATE, а лента популярного читается по индексу.
+"""
+
+import math
+from datetime import datetime, timezone
+from typing import Iterable
+
+from django.conf import settings
+from django.db.models import F, Value
+from django.db.models.functions import Abs, Coalesce, Exp, Greatest, Ln
+from django.db.models.query import QuerySet
+
+from posts.models import Comment, Post
+
+EPOCH = datetime(2022, 1, 1, tzinfo=timezone.utc)
+POST_WEIGHT = 1.0
+COMMENT_WEIGHT = 1.0
+REBUILD_BATCH_SIZE = 1000
+
+
+def tau() -> float:
+    return settings.TRENDING_HALF_LIFE * 3600 / math.log(2)
+
+
+def event_score(when: datetime, weight: float) -> float:
+    return math.log(weight) + (when - EPOCH).total_seconds() / tau()
+
+
+def combine(scores: Iterable[float]) -> float:
+    scores = list(scores)
+    top = max(scores)
+    return top + math.log(sum(math.exp(score - top) for score in scores))
+
+
+def add_score(post_id: int, score: float) -> None:
+    # ln(e^a + e^b) = max(a, b) + ln(1 + e^-|a - b|) без переполнения.
+    # У поста без рейтинга (NULL) событие становится первым слагаемым.
+    event = Value(score)
+    Post.objects.filter(pk=post_id).update(
+        trending_score=Coalesce(
+            Greatest(F('trending_score'), event)
+            + Ln(1 + Exp(-Abs(F('trending_score') - event))),
+            event,
+        ),
+    )
+
+
+def add_event(post_id: int, when: datetime, weight: float) -> None:
+    add_score(post_id, event_score(when, weight))
+
+
+def trending_posts() -> QuerySet:
+    return Post.objects.select_related('author', 'group').filter(
+        trending_score__isnull=False,
+    )
+
+
+def rebuild() -> None:
+    """Пересчитывает рейтинг всех постов пачками по REBUILD_BATCH_SIZE."""
+    last_pk = 0
+    while True:
+        scores = {
+            pk: [event_score(pub_date, POST_WEIGHT)]
+            for pk, pub_date in Post.objects.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', 'pub_date')[:REBUILD_BATCH_SIZE]
+        }
+        if not scores:
+            return
+        for post_id, created in (
+            Comment.objects.filter(
+                post_id__in=list(scores),
+            )
+            .values_list('post_id', 'created')
+            .iterator()
+        ):
+            scores[post_id].append(event_score(created, COMMENT_WEIGHT))
+        Post.objects.bulk_update(
+            [
+                Post(pk=pk, trending_score=combine(events))
+                for pk, events in scores.items()
+            ],
+            ['trending_score'],
+            batch_size=500,
+        )
+        last_pk = max(scores)
@@ -9,7 +9,10 @@ urlpatterns = [
     path('', views.index, name='index'),
     path('create/', views.post_create, name='post_create'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('group/', views.group_index, name='group_index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('search/', views.search, name='search'),
+    path('trending/', views.trending_index, name='trending'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path(
         'posts/<int:post_id>/comment/',
@@ -0,0 +1,93 @@
+"""
+Валидаторы условного GET для страниц поста, профиля и группы.
+
+ETag складывается из версий объектов (поколений в общем кэше, которые
+увеличивают сигналы при записи) и пользователя, для которого отрисована
+страница. Last-Modified не отдаётся: удаление, подписка или вход не
+сдвигают ни одну дату, и браузер получал бы 304 на устаревшую страницу.
+"""
+
+from typing import List, Optional
+
+from django.contrib.auth import get_user_model
+
+from core.cache import bump_generation, versions_etag
+from posts.models import Group, Post
+
+User = get_user_model()
+
+GROUPS_SCOPE = 'groups'
+# Меняется, только когда меняется число постов в общей ленте; число
+# постов группы и автора следует за поколениями group_scope и author_scope.
+COUNTS_SCOPE = 'post_counts'
+
+
+def post_scope(post_id: int) -> str:
+    return f'post:{post_id}'
+
+
+def author_scope(user_id: int) -> str:
+    return f'author:{user_id}'
+
+
+def group_scope(group_id: int) -> str:
+    return f'group:{group_id}'
+
+
+def post_scopes(
+    post_id: int,
+    author_id: int,
+    group_id: Optional[int],
+) -> List[str]:
+    scopes = [post_scope(post_id), author_scope(author_id)]
+    if group_id is not None:
+        scopes.append(group_scope(group_id))
+    return scopes
+
+
+def touch_post(post_id: int, author_id: int, group_id: Optional[int]) -> None:
+    bump_generation(*post_scopes(post_id, author_id, group_id))
+
+
+def post_detail(request, post_id: int) -> Optional[str]:
+    row = (
+        Post.objects.filter(pk=post_id)
+        .values_list('author_id', 'group_id')
+        .first()
+    )
+    if row is None:
+        return None
+    author_id, group_id = row
+    return versions_etag(
+        post_scopes(post_id, author_id, group_id),
+        request.user.pk,
+        request.get_full_path(),
+    )
+
+
+def profile(request, username: str) -> Optional[str]:
+    author_id = (
+        User.objects.filter(username=username)
+        .values_list('pk', flat=True)
+        .first()
+    )
+    if author_id is None:
+        return None
+    return versions_etag(
+        (author_scope(author_id), GROUPS_SCOPE),
+        request.user.pk,
+        request.get_full_path(),
+    )
+
+
+def group_posts(request, slug: str) -> Optional[str]:
+    group_id = (
+        Group.objects.filter(slug=slug).values_list('pk', flat=True).first()
+    )
+    if group_id is None:
+        return None
+    return versions_etag(
+        (group_scope(group_id),),
+        request.user.pk,
+        request.get_full_path(),
+    )
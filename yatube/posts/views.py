@@ -1,72 +1,200 @@
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
-from django.http import HttpRequest, HttpResponse
+from django.db import transaction
+from django.http import Http404, HttpRequest, HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
-from django.views.decorators.cache import cache_page
+from django.utils.http import urlencode
 
-from core.utils import paginate
+from core.cache import cache_page_generation, conditional
+from core.concurrency import gather
+from core.paginator import KeysetPaginator
+from core.thumbnails import resolve_thumbnails
+from core.uploads import limited_image_uploads
+from core.utils import evaluate_page, paginate
+from posts import recommendations, timeline, trending, versions
+from posts.comment_buffer import comment_buffer, pending_for
+from posts.follow_cache import follow_cache
 from posts.forms import CommentForm, PostForm
-from posts.models import Follow, Group, Post
+from posts.models import Comment, Follow, Group, Post
+from posts.search import search_posts
 
 
-@cache_page(settings.CACHE_UPDATE, key_prefix='index_page')
+@cache_page_generation(
+    settings.CACHE_UPDATE,
+    key_prefix='index_page',
+    scopes=('posts',),
+)
 def index(request: HttpRequest) -> HttpResponse:
-    posts = Post.objects.select_related('author')
+    posts = Post.objects.select_related('author', 'group')
     return render(
         request,
         'posts/index.html',
         {
-            'page_obj': paginate(request, posts),
+            'page_obj': resolve_thumbnails(
+                paginate(
+                    request,
+                    posts,
+                    count_scopes=(versions.COUNTS_SCOPE,),
+                    estimate=True,
+                ),
+                'post_card',
+            ),
         },
     )
 
 
+def group_index(request: HttpRequest) -> HttpResponse:
+    return render(
+        request,
+        'posts/group_index.html',
+        {
+            'groups': Group.objects.select_related('stats').order_by(
+                'title',
+            ),
+        },
+    )
+
+
+@conditional(versions.group_posts)
 def group_posts(request: HttpRequest, slug: str) -> HttpResponse:
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.select_related('group')
+    group = get_object_or_404(
+        Group.objects.select_related('stats'),
+        slug=slug,
+    )
+    posts = Post.objects.filter(group=group).select_related(
+        'author',
+        'group',
+    )
     return render(
         request,
         'posts/group_list.html',
         {
             'group': group,
-            'page_obj': paginate(request, posts),
+            'page_obj': resolve_thumbnails(
+                paginate(
+                    request,
+                    posts,
+                    count_scopes=(versions.group_scope(group.pk),),
+                ),
+                'post_card',
+            ),
         },
     )
 
 
+@conditional(versions.profile)
 def profile(request: HttpRequest, username: str) -> HttpResponse:
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.select_related('author', 'group')
-    following = (
-        request.user.is_authenticated
-        and request.user.follower.filter(author=author).exists()
+    author = get_object_or_404(
+        User.objects.select_related('stats'),
+        username=username,
+    )
+    posts = Post.objects.filter(author=author).select_related(
+        'author',
+        'group',
+    )
+    page_obj, following = gather(
+        lambda: resolve_thumbnails(
+            evaluate_page(
+                paginate(
+                    request,
+                    posts,
+                    count_scopes=(versions.author_scope(author.pk),),
+                ),
+            ),
+            'post_card',
+        ),
+        lambda: request.user.is_authenticated
+        and follow_cache.is_following(
+            request.user,
+            author.pk,
+        ),
     )
     return render(
         request,
         'posts/profile.html',
         {
             'author': author,
-            'page_obj': paginate(request, posts),
+            'page_obj': page_obj,
             'following': following,
         },
     )
 
 
+@conditional(versions.post_detail)
 def post_detail(request: HttpRequest, post_id: int) -> HttpResponse:
-    post = get_object_or_404(Post, pk=post_id)
+    comments = Comment.objects.filter(post_id=post_id).select_related(
+        'author',
+    )
+    post, comments = gather(
+        lambda: get_object_or_404(
+            Post.objects.select_related('author__stats', 'group'),
+            pk=post_id,
+        ),
+        lambda: evaluate_page(
+            paginate(
+                request,
+                comments,
+                settings.COMMENTS_QUANTITY,
+                keyset=False,
+                count_scopes=(versions.post_scope(post_id),),
+            ),
+        ),
+    )
     form = CommentForm()
     return render(
         request,
         'posts/post_detail.html',
         {
             'post': post,
+            'comments': comments,
+            'pending_comments': (
+                pending_for(request.user, post_id, comments)
+                if comments.number == 1
+                else []
+            ),
             'form': form,
         },
     )
 
 
+def trending_index(request: HttpRequest) -> HttpResponse:
+    page_obj = KeysetPaginator(
+        trending.trending_posts(),
+        settings.POSTS_QUANTITY,
+        key_field='trending_score',
+    ).get_page(request.GET.get('cursor'))
+    return render(
+        request,
+        'posts/trending.html',
+        {
+            'page_obj': resolve_thumbnails(page_obj, 'post_card'),
+        },
+    )
+
+
+def search(request: HttpRequest) -> HttpResponse:
+    query = request.GET.get('q', '').strip()
+    posts = search_posts(query)
+    page_obj = KeysetPaginator(
+        posts,
+        settings.POSTS_QUANTITY,
+        key_field='score',
+    ).get_page(request.GET.get('cursor'))
+    return render(
+        request,
+        'posts/search.html',
+        {
+            'query': query,
+            'page_obj': resolve_thumbnails(page_obj, 'post_card'),
+            'page_query': urlencode({'q': query}),
+        },
+    )
+
+
+@limited_image_uploads
 @login_required
+@transaction.atomic
 def post_create(request: HttpRequest) -> HttpResponse:
     form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
@@ -83,6 +211,7 @@ def post_create(request: HttpRequest) -> HttpResponse:
     )
 
 
+@limited_image_uploads
 @login_required
 def post_edit(request: HttpRequest, post_id: int) -> HttpResponse:
     post = get_object_or_404(Post, pk=post_id)
@@ -109,40 +238,59 @@ def post_edit(request: HttpRequest, post_id: int) -> HttpResponse:
 
 
 @login_required
+@transaction.atomic
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post.objects.only('pk'), pk=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        if settings.COMMENT_WRITE_BEHIND:
+            comment_buffer.add(comment)
+        else:
+            comment.save()
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
+    pulled = timeline.pull_authors(request.user)
     return render(
         request,
         'posts/follow.html',
         {
-            'page_obj': paginate(request, posts),
+            'page_obj': resolve_thumbnails(
+                paginate(
+                    request,
+                    timeline.feed(request.user, pulled),
+                    count_scopes=timeline.feed_scopes(request.user, pulled),
+                ),
+                'post_card',
+            ),
+            'suggestions': recommendations.for_user(request.user),
         },
     )
 
 
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
-    if request.user != author:
+    if request.user != author and not follow_cache.is_following(
+        request.user,
+        author.pk,
+    ):
         Follow.objects.get_or_create(user=request.user, author=author)
     return redirect('posts:profile', username=username)
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
     if request.user != author:
+        if not follow_cache.is_following(request.user, author.pk):
+            raise Http404
         get_object_or_404(Follow, user=request.user, author=author).delete()
     return redirect('posts:profile', username=username)
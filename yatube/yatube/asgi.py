@@ -0,0 +1,9 @@
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+from core.asgi import ThreadPoolWsgiToAsgi
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+application = ThreadPoolWsgiToAsgi(get_wsgi_application())
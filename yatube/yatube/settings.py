@@ -1,9 +1,10 @@
-import sentry_sdk
 import os
+import sys
+
+import sentry_sdk
 from dotenv import load_dotenv
 from sentry_sdk.integrations.django import DjangoIntegration
 
-
 load_dotenv()
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -29,6 +30,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
     'core.apps.CoreConfig',
     'posts.apps.PostsConfig',
     'users.apps.UsersConfig',
@@ -36,6 +38,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -45,13 +49,15 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+TEST_RUNNER = 'core.testing.TestRunner'
+
 ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -61,6 +67,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'core.context_processors.cache.timeouts',
             ],
         },
     },
@@ -68,17 +75,68 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+# Размер пула соединений на процесс; 0 — без пула.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 0))
+
 DATABASES = {
     'default': {
         'ENGINE': os.getenv('DB_ENGINE', 'django.db.backends.postgresql'),
         'NAME': os.getenv('DB_NAME'),
         'USER': os.getenv('POSTGRES_USER'),
-	'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
-	'HOST': os.getenv('DB_HOST'),
-	'PORT': os.getenv('DB_PORT'),
+        'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
+        'HOST': os.getenv('DB_HOST'),
+        'PORT': os.getenv('DB_PORT'),
+        # С пулом соединение возвращается в него в конце каждого запроса.
+        'CONN_MAX_AGE': int(
+            os.getenv('DB_CONN_MAX_AGE', 0 if DB_POOL_SIZE else 60),
+        ),
     },
 }
 
+if DB_POOL_SIZE and DATABASES['default']['ENGINE'].endswith('postgresql'):
+    DATABASES['default']['ENGINE'] = 'core.backends.postgresql'
+    DATABASES['default']['POOL'] = {
+        'SIZE': DB_POOL_SIZE,
+        'TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        'CHECK_INTERVAL': float(os.getenv('DB_POOL_CHECK_INTERVAL', 30)),
+    }
+
+# Реплики через запятую: хосты PostgreSQL или файлы SQLite.
+DATABASE_REPLICAS = []
+
+for number, replica in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', '').split(',')),
+):
+    alias = f'replica{number}'
+    DATABASES[alias] = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+    if DATABASES[alias]['ENGINE'].endswith('sqlite3'):
+        DATABASES[alias]['NAME'] = replica
+    else:
+        DATABASES[alias]['HOST'] = replica
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+REPLICA_APPS = ('posts', 'auth')
+
+REPLICA_VIEWS = (
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:follow_index',
+)
+
+PRIMARY_VIEWS = (
+    'posts:post_create',
+    'posts:post_edit',
+    'posts:add_comment',
+    'posts:profile_follow',
+    'posts:profile_unfollow',
+)
+
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', 5))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -108,6 +166,36 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static/')
 
 POSTS_QUANTITY = 10
 
+COMMENTS_QUANTITY = 20
+
+COMMENT_WRITE_BEHIND = bool(int(os.getenv('COMMENT_WRITE_BEHIND', 0)))
+
+COMMENT_BUFFER_SIZE = int(os.getenv('COMMENT_BUFFER_SIZE', 100))
+
+COMMENT_FLUSH_INTERVAL = int(os.getenv('COMMENT_FLUSH_INTERVAL', 200))
+
+GROUP_TOP_AUTHORS = 3
+
+FOLLOW_CACHE_SIZE = 10000
+
+RECOMMENDATIONS_STORED = 20
+
+RECOMMENDATIONS_SHOWN = 5
+
+RECOMMENDATIONS_MAX_FOLLOWERS = 1000
+
+TRENDING_HALF_LIFE = 6
+
+KEYSET_PAGINATED_VIEWS = ()
+
+PAGINATOR_ON_EACH_SIDE = 2
+
+PAGINATOR_ON_ENDS = 1
+
+PAGINATOR_ESTIMATE_THRESHOLD = 100000
+
+TIMELINE_FANOUT_LIMIT = 5000
+
 POST_CHARACTER_LIMIT = 15
 
 LOGIN_URL = 'users:login'
@@ -128,13 +216,64 @@ MEDIA_TESTS = os.path.join(BASE_DIR, 'media_test')
 
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache',
+        ),
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION',
+            os.path.join(BASE_DIR, 'cache'),
+        ),
+        'TIMEOUT': int(os.getenv('CACHE_TIMEOUT', 60 * 60)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', 100000)),
+            'CULL_FREQUENCY': int(os.getenv('CACHE_CULL_FREQUENCY', 10)),
+        },
+    },
+    # Номера поколений и ожидающие записи комментарии. Вытеснение молча
+    # сбрасывало бы инвалидацию, поэтому у них своё хранилище без лимита.
+    'state': {
+        'BACKEND': os.getenv(
+            'STATE_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache',
+        ),
+        'LOCATION': os.getenv(
+            'STATE_CACHE_LOCATION',
+            os.path.join(BASE_DIR, 'cache_state'),
+        ),
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': sys.maxsize,
+        },
     },
 }
 
-CACHE_UPDATE = 20
+CACHE_UPDATE = int(os.getenv('CACHE_UPDATE', 60 * 60))
+
+POST_CARD_CACHE_TIMEOUT = int(
+    os.getenv('POST_CARD_CACHE_TIMEOUT', 60 * 60 * 24),
+)
+
+THUMBNAIL_ALIASES = {
+    'post_card': ('960x339', {'crop': 'center', 'upscale': True}),
+}
+
+THUMBNAIL_WORKERS = int(os.getenv('THUMBNAIL_WORKERS', 2))
+
+VIEW_QUERY_WORKERS = int(os.getenv('VIEW_QUERY_WORKERS', 0))
+
+# Сборщик метрик передаёт его в заголовке Authorization: Bearer <токен>.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+
+IMAGE_ALLOWED_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+
+IMAGE_MAX_DIMENSIONS = (8000, 8000)
+
+IMAGE_MAX_SIDE = 1920
 
 sentry_sdk.init(
-    dsn='https://f8acd87e46f74472ae35d231c397f5d6@o4504908228329472.ingest.sentry.io/4504912249487360', 
+    dsn='https://f8acd87e46f74472ae35d231c397f5d6@o4504908228329472.ingest.sentry.io/4504912249487360',
     integrations=[DjangoIntegration()],
 )
@@ -5,6 +5,8 @@ from django.contrib.auth.apps import AuthConfig
 from django.urls import include, path
 
 from about.apps import AboutConfig
+from api.apps import ApiConfig
+from core.views import metrics
 from posts.apps import PostsConfig
 
 handler403 = 'core.views.permission_denied'
@@ -14,6 +16,8 @@ handler500 = 'core.views.server_error'
 urlpatterns = [
     path('about/', include('about.urls', namespace=AboutConfig.name)),
     path('admin/', admin.site.urls),
+    path('api/v1/', include('api.urls', namespace=ApiConfig.name)),
+    path('metrics/', metrics, name='metrics'),
     path('auth/', include('users.urls', namespace=AuthConfig.name)),
     path('auth/', include('django.contrib.auth.urls')),
     path('', include('posts.urls', namespace=PostsConfig.name)),